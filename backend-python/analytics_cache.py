@@ -0,0 +1,209 @@
+"""
+AdminEstate - Analytics Cache
+Purpose: Share analytics results across requests and routes in one process
+
+This module provides:
+- AnalyticsCache: values computed once per table version and reused by
+  every analytics route until the underlying tables change
+- A typed properties DataFrame (numeric columns as float64, dates as
+  datetime64) loaded at most once per properties table version
+- Snapshots: results published by the background scheduler
+  (analytics_scheduler.py) with the time they were computed
+- Hit/miss counters for the /api/health/analytics-cache endpoint
+
+Freshness:
+- An entry is only served for the table_versions counters (see schema.sql)
+  it was computed at, so writes from any worker or process are picked up
+  on the next lookup
+- Routes behind conditional_get pass the versions their ETag was built
+  from, so a body is never cached by clients under a newer ETag than the
+  data it holds (and the lookup costs no extra query)
+- Writes made through db.py (create/update/delete_property) also drop
+  dependent entries right away via db.add_write_listener
+- Scheduler jobs run inside pinned_versions(), so the entries they read
+  are for the versions their snapshot is recorded at
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import pandas as pd
+
+import db
+
+# Typed column groups for the properties DataFrame
+PROPERTY_NUMERIC_COLUMNS = ['units', 'occupied', 'monthlyRevenue', 'purchasePrice']
+PROPERTY_DATE_COLUMNS = ['purchaseDate', 'created_at', 'updated_at']
+
+
+# Versions lookups in this context must use (see pinned_versions)
+_pinned_versions: ContextVar[Optional[Dict[str, int]]] = ContextVar('pinned_versions', default=None)
+
+
+@contextmanager
+def pinned_versions(versions: Dict[str, int]) -> Iterator[None]:
+    """
+    Serve cache lookups in this context at the given table versions.
+
+    Lookups that pass no versions of their own and whose tables are all
+    pinned use these instead of re-reading table_versions.
+    """
+    token = _pinned_versions.set(versions)
+    try:
+        yield
+    finally:
+        _pinned_versions.reset(token)
+
+
+class _Entry:
+    __slots__ = ('tables', 'versions', 'value')
+
+    def __init__(self, tables: Tuple[str, ...], versions: Tuple[int, ...], value: Any):
+        self.tables = tables
+        self.versions = versions
+        self.value = value
+
+
+class Snapshot:
+    """A published result and when/at which table versions it was computed"""
+    __slots__ = ('value', 'versions', 'computed_at')
+
+    def __init__(self, value: Any, versions: Dict[str, int]):
+        self.value = value
+        self.versions = versions
+        self.computed_at = datetime.now(timezone.utc)
+
+
+class AnalyticsCache:
+    """Thread-safe cache of computed values keyed by name and table versions"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        # Snapshots survive invalidate(): serving the previous result while
+        # the scheduler recomputes is what keeps them off the request path
+        self._snapshots: Dict[str, Snapshot] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _current(self, key: str, versions: Tuple[int, ...]) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.versions == versions:
+            return entry
+        return None
+
+    def get_or_compute(self, key: str, tables: Sequence[str], compute: Callable[[], Any],
+                       versions: Optional[Dict[str, int]] = None) -> Any:
+        """
+        Return the value for key at the current table versions, computing it
+        if the cached entry was computed at other versions.
+
+        Args:
+            key: Cache entry name (e.g. 'dashboard')
+            tables: Tables the value is derived from
+            compute: Zero-argument function producing the value
+            versions: {table: version} the caller already read (e.g. for an
+                ETag); defaults to pinned_versions(), else read from
+                table_versions
+        """
+        tables = tuple(tables)
+        if versions is None:
+            versions = _pinned_versions.get()
+        if versions is None or any(table not in versions for table in tables):
+            current = db.get_table_versions(tables)
+            versions = {table: current[table]['version'] for table in tables}
+        key_versions = tuple(versions[table] for table in tables)
+
+        with self._lock:
+            entry = self._current(key, key_versions)
+            if entry is not None:
+                self.hits += 1
+                return entry.value
+
+        # One loader per key; concurrent callers wait and reuse its result
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._current(key, key_versions)
+                if entry is not None:
+                    self.hits += 1
+                    return entry.value
+
+            # Versions were read before computing, so a write that lands while
+            # computing leaves the entry one version behind and it is reloaded
+            value = compute()
+            with self._lock:
+                self._entries[key] = _Entry(tables, key_versions, value)
+                self.misses += 1
+            return value
+
+    def invalidate(self, table: Optional[str] = None):
+        """Drop entries derived from table (all entries when table is None)"""
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if table is None or table in entry.tables
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def put_snapshot(self, key: str, value: Any, versions: Dict[str, int]) -> Snapshot:
+        snapshot = Snapshot(value, versions)
+        with self._lock:
+            self._snapshots[key] = snapshot
+        return snapshot
+
+    def get_snapshot(self, key: str) -> Optional[Snapshot]:
+        with self._lock:
+            return self._snapshots.get(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'snapshots': len(self._snapshots),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations,
+            }
+
+
+# Shared by all analytics routes in this process
+cache = AnalyticsCache()
+db.add_write_listener(cache.invalidate)
+
+
+def _load_properties_frame() -> pd.DataFrame:
+    df = pd.DataFrame(db.get_all_properties(), columns=list(db.PROPERTY_FIELDS))
+    for column in PROPERTY_NUMERIC_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    for column in PROPERTY_DATE_COLUMNS:
+        df[column] = pd.to_datetime(df[column], errors='coerce')
+    return df
+
+
+def get_properties_frame() -> pd.DataFrame:
+    """
+    Typed DataFrame of all properties for the current table version.
+
+    The frame is shared between callers - treat it as read-only (copy
+    before adding columns).
+    """
+    return cache.get_or_compute('properties_frame', ('properties',), _load_properties_frame)
+
+
+def cached(key: str, tables: Sequence[str], compute: Callable[[], Any],
+           versions: Optional[Dict[str, int]] = None) -> Any:
+    """Shorthand for cache.get_or_compute on the shared cache"""
+    return cache.get_or_compute(key, tables, compute, versions)
@@ -0,0 +1,385 @@
+"""
+AdminEstate - SQL Analytics Queries
+Purpose: Compute /api/analytics/* metrics inside PostgreSQL
+
+Each function runs one aggregate query and returns only the small result
+rows (totals, per-type groups, top-N lists, correlation coefficients)
+instead of pulling whole tables into a pandas DataFrame per request.
+
+Dashboard, per-type and summary totals read the trigger-maintained
+portfolio_rollup table (see schema.sql), so they cost a handful of row
+lookups regardless of how many properties exist. Ratios derived from
+those totals, and per-property metrics, use the vectorized kernels in
+metrics.py.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import analytics_cache
+import db
+import metrics
+
+# portfolio_rollup key of the portfolio-wide row (other rows are keyed by type)
+ROLLUP_ALL = '__all__'
+
+# Trend bucket sizes accepted by get_financial_trends (date_trunc field names)
+TREND_PERIODS = ('week', 'month', 'quarter', 'year')
+# Transaction types counted as money in / money out
+INCOME_TYPES = ('income', 'payment')
+EXPENSE_TYPES = ('expense', 'refund')
+
+# Numeric property columns used by the correlation matrix (API name -> column)
+CORRELATION_COLUMNS = {
+    'units': 'units',
+    'occupied': 'occupied',
+    'monthlyRevenue': 'monthly_revenue',
+    'purchasePrice': 'purchase_price',
+}
+
+
+def get_dashboard_metrics() -> Dict[str, Any]:
+    """Portfolio KPIs for the main dashboard"""
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT
+                COALESCE(MAX(property_count), 0) AS total_properties,
+                COALESCE(MAX(total_value), 0) AS total_portfolio_value,
+                COALESCE(MAX(total_revenue), 0) AS total_monthly_revenue,
+                COALESCE(MAX(cap_rate_sum / NULLIF(cap_rate_count, 0)), 0) AS avg_cap_rate,
+                COALESCE(MAX(total_units), 0) AS total_units,
+                COALESCE(MAX(occupied_units), 0) AS occupied_units,
+                COALESCE(MAX(total_value / NULLIF(value_count, 0)), 0) AS avg_property_value,
+                COALESCE(MAX(total_revenue / NULLIF(revenue_count, 0)), 0) AS avg_revenue_per_property
+            FROM portfolio_rollup
+            WHERE rollup_key = %s
+        """, (ROLLUP_ALL,))
+        result = dict(cur.fetchone())
+
+    result['vacant_units'] = result['total_units'] - result['occupied_units']
+    result['occupancy_rate'] = metrics.occupancy_rate(
+        result['occupied_units'], result['total_units']
+    ).item()
+    return result
+
+
+def get_property_type_breakdown() -> Dict[str, Dict[str, Any]]:
+    """Portfolio totals grouped by property type"""
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT
+                rollup_key AS type,
+                property_count,
+                total_value,
+                total_revenue,
+                total_units,
+                occupied_units
+            FROM portfolio_rollup
+            WHERE rollup_key <> %s AND property_count > 0
+            ORDER BY rollup_key
+        """, (ROLLUP_ALL,))
+        rows = [dict(row) for row in cur.fetchall()]
+
+    cap_rates = metrics.cap_rate([row['total_revenue'] for row in rows],
+                                 [row['total_value'] for row in rows])
+    for row, value in zip(rows, cap_rates.tolist()):
+        row['avg_cap_rate'] = value
+    return {row.pop('type'): row for row in rows}
+
+
+def get_top_properties(limit: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+    """Top properties by purchase price and by monthly revenue"""
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT name, type, units, purchase_price AS "purchasePrice"
+            FROM properties
+            WHERE purchase_price IS NOT NULL
+            ORDER BY purchase_price DESC
+            LIMIT %s
+        """, (limit,))
+        top_by_value = [dict(row) for row in cur.fetchall()]
+
+        cur.execute("""
+            SELECT name, type, monthly_revenue AS "monthlyRevenue", occupied, units
+            FROM properties
+            WHERE monthly_revenue IS NOT NULL
+            ORDER BY monthly_revenue DESC
+            LIMIT %s
+        """, (limit,))
+        top_by_revenue = [dict(row) for row in cur.fetchall()]
+
+    # Same kernel as the dashboard and property metrics (0 for zero units)
+    rates = metrics.occupancy_rate([row.pop('occupied') for row in top_by_revenue],
+                                   [row.pop('units') for row in top_by_revenue])
+    for row, rate in zip(top_by_revenue, rates.tolist()):
+        row['occupancy_rate'] = rate
+
+    return {'top_by_value': top_by_value, 'top_by_revenue': top_by_revenue}
+
+
+def get_portfolio_summary() -> Dict[str, Any]:
+    """Portfolio-wide counts and totals (empty dict when there are no properties)"""
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT
+                COALESCE(SUM(property_count) FILTER (WHERE rollup_key = %(all)s), 0) AS total_properties,
+                COALESCE(SUM(total_value) FILTER (WHERE rollup_key = %(all)s), 0) AS total_value,
+                COALESCE(SUM(total_revenue) FILTER (WHERE rollup_key = %(all)s), 0) AS total_revenue,
+                (SELECT COUNT(*) FROM tenants) AS total_tenants,
+                COUNT(*) FILTER (WHERE rollup_key <> %(all)s AND property_count > 0) AS property_types,
+                SUM(total_units) FILTER (WHERE rollup_key = %(all)s)::numeric
+                    / NULLIF(SUM(property_count) FILTER (WHERE rollup_key = %(all)s), 0)
+                    AS avg_units_per_property
+            FROM portfolio_rollup
+        """, {'all': ROLLUP_ALL})
+        summary = dict(cur.fetchone())
+
+    return summary if summary['total_properties'] else {}
+
+
+def get_occupancy_report() -> Dict[str, Any]:
+    """
+    Per-property occupancy, rent roll total and tenant count plus a summary.
+
+    Tenants are aggregated per property once (hash aggregate) and joined to
+    properties, so the cost is linear in properties + tenants. Only tenants
+    with status 'Current' count toward total_rent and tenant_count.
+    """
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT
+                p.id AS property_id,
+                p.name AS property_name,
+                p.units AS total_units,
+                p.occupied AS occupied_units,
+                p.units - p.occupied AS vacant_units,
+                COALESCE(t.total_rent, 0) AS total_rent,
+                COALESCE(t.tenant_count, 0) AS tenant_count
+            FROM properties p
+            LEFT JOIN (
+                SELECT property_id, SUM(rent) AS total_rent, COUNT(*) AS tenant_count
+                FROM tenants
+                WHERE status = 'Current'
+                GROUP BY property_id
+            ) t ON t.property_id = p.id
+            ORDER BY p.name
+        """)
+        properties = [dict(row) for row in cur.fetchall()]
+
+    rates = metrics.occupancy_rate([row['occupied_units'] for row in properties],
+                                   [row['total_units'] for row in properties])
+    for row, rate in zip(properties, rates.tolist()):
+        row['occupancy_rate'] = rate
+
+    total_units = sum(row['total_units'] for row in properties)
+    total_occupied = sum(row['occupied_units'] for row in properties)
+    return {
+        'properties': properties,
+        'summary': {
+            'total_properties': len(properties),
+            'total_units': total_units,
+            'total_occupied': total_occupied,
+            'total_vacant': total_units - total_occupied,
+            'total_rent': sum(row['total_rent'] for row in properties),
+            'total_tenants': sum(row['tenant_count'] for row in properties),
+            'average_occupancy_rate': metrics.occupancy_rate(total_occupied, total_units).item(),
+        },
+    }
+
+
+# When a work order was opened / resolved (updated_at of a Completed order)
+WORK_ORDER_OPENED_AT = "COALESCE(submitted_at, approved_at, date::timestamp)"
+WORK_ORDER_RESOLUTION_DAYS = f"EXTRACT(EPOCH FROM (updated_at - {WORK_ORDER_OPENED_AT})) / 86400"
+
+
+def get_work_order_performance() -> Dict[str, Any]:
+    """
+    Work order counts by status, category and priority, plus median/p90
+    resolution time in days (overall and per category) for completed orders.
+    """
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT
+                CASE
+                    WHEN GROUPING(status) = 0 THEN 'status'
+                    WHEN GROUPING(category) = 0 THEN 'category'
+                    ELSE 'priority'
+                END AS dimension,
+                -- GROUPING() tells the set apart; a NULL value stays its own key
+                CASE
+                    WHEN GROUPING(status) = 0 THEN status
+                    WHEN GROUPING(category) = 0 THEN category
+                    ELSE priority
+                END AS key,
+                COUNT(*) AS count
+            FROM work_orders
+            GROUP BY GROUPING SETS ((status), (category), (priority))
+        """)
+        count_rows = cur.fetchall()
+
+        cur.execute(f"""
+            SELECT
+                GROUPING(category) = 1 AS overall,
+                category,
+                COUNT(*) AS count,
+                AVG({WORK_ORDER_RESOLUTION_DAYS}) AS avg,
+                percentile_cont(0.5) WITHIN GROUP (ORDER BY {WORK_ORDER_RESOLUTION_DAYS}) AS median,
+                percentile_cont(0.9) WITHIN GROUP (ORDER BY {WORK_ORDER_RESOLUTION_DAYS}) AS p90
+            FROM work_orders
+            WHERE status = 'Completed'
+              AND updated_at IS NOT NULL
+            GROUP BY GROUPING SETS ((), (category))
+            ORDER BY GROUPING(category) DESC, category
+        """)
+        resolution_rows = [dict(row) for row in cur.fetchall()]
+
+    counts: Dict[str, Dict[str, int]] = {'status': {}, 'category': {}, 'priority': {}}
+    for row in count_rows:
+        counts[row['dimension']][row['key']] = row['count']
+    by_status, by_category, by_priority = counts['status'], counts['category'], counts['priority']
+
+    overall = next((row for row in resolution_rows if row['overall']), {})
+    return {
+        'total': sum(by_status.values()),
+        'open': by_status.get('Pending', 0),
+        'in_progress': by_status.get('In Progress', 0),
+        'completed': by_status.get('Completed', 0),
+        'cancelled': by_status.get('Cancelled', 0),
+        'by_status': by_status,
+        'by_category': by_category,
+        'by_priority': by_priority,
+        'resolution_days': {
+            'count': overall.get('count', 0),
+            'avg': overall.get('avg'),
+            'median': overall.get('median'),
+            'p90': overall.get('p90'),
+        },
+        'resolution_days_by_category': {
+            row.pop('category'): {key: value for key, value in row.items() if key != 'overall'}
+            for row in resolution_rows if not row['overall']
+        },
+    }
+
+
+def get_annual_expenses_by_property() -> Dict[int, float]:
+    """Expense transactions over the last 12 months, summed per property"""
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT property_id, SUM(amount) AS expenses
+            FROM transactions
+            WHERE type = 'expense'
+              AND property_id IS NOT NULL
+              AND date >= CURRENT_DATE - INTERVAL '12 months'
+            GROUP BY property_id
+        """)
+        return {row['property_id']: row['expenses'] for row in cur.fetchall()}
+
+
+def get_property_metrics() -> List[Dict[str, Any]]:
+    """
+    Per-property derived metrics (occupancy, price/revenue per unit, cap
+    rate, NOI, size category) computed with the metrics.py kernels over the
+    cached typed properties frame.
+    """
+    df = analytics_cache.get_properties_frame()
+    if df.empty:
+        return []
+
+    expenses = get_annual_expenses_by_property()
+    annual_expenses = df['id'].map(expenses).astype('float64')
+    result = df[['id', 'name', 'type', 'units', 'occupied', 'monthlyRevenue', 'purchasePrice']].join(
+        metrics.property_metrics(df, annual_expenses)
+    )
+    result['annual_expenses'] = annual_expenses.fillna(0).to_numpy()
+    return result.to_dict(orient='records')
+
+
+def get_financial_trends(period: str = 'month', start: Optional[date] = None,
+                         end: Optional[date] = None,
+                         property_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Income, expense and net totals per period.
+
+    Month, quarter and year buckets are summed from the trigger-maintained
+    transaction_monthly table (bounds are widened to whole months); weekly
+    buckets need day precision and aggregate transactions directly.
+
+    Raises:
+        ValueError: Unknown period
+    """
+    if period not in TREND_PERIODS:
+        raise ValueError(f"Invalid period '{period}' (expected one of: {', '.join(TREND_PERIODS)})")
+
+    if period == 'week':
+        source, date_column = 'transactions', 'date'
+    else:
+        source, date_column = 'transaction_monthly', 'month'
+
+    where = []
+    params: Dict[str, Any] = {
+        'period': period,
+        'income_types': list(INCOME_TYPES),
+        'expense_types': list(EXPENSE_TYPES),
+    }
+    if start is not None:
+        where.append(f"{date_column} >= date_trunc(%(period)s, %(start)s::date)")
+        params['start'] = start
+    if end is not None:
+        where.append(f"{date_column} <= %(end)s")
+        params['end'] = end
+    if property_id is not None:
+        where.append("property_id = %(property_id)s")
+        params['property_id'] = property_id
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute(f"""
+            SELECT
+                date_trunc(%(period)s, {date_column})::date AS bucket,
+                COALESCE(SUM(amount) FILTER (WHERE type = ANY(%(income_types)s)), 0) AS income,
+                COALESCE(SUM(amount) FILTER (WHERE type = ANY(%(expense_types)s)), 0) AS expense
+            FROM {source}
+            {where_sql}
+            GROUP BY 1
+            ORDER BY 1
+        """, params)
+        rows = cur.fetchall()
+
+    income = [row['income'] for row in rows]
+    expense = [row['expense'] for row in rows]
+    return {
+        'period': period,
+        'labels': [row['bucket'] for row in rows],
+        'income_trend': income,
+        'expense_trend': expense,
+        'net_trend': [i - e for i, e in zip(income, expense)],
+    }
+
+
+def get_correlation_matrix() -> Dict[str, Dict[str, Any]]:
+    """
+    Pearson correlation between the numeric property columns.
+
+    Same shape as DataFrame.corr().to_dict(); pairs with zero variance are
+    None. Returns an empty dict with fewer than two properties.
+    """
+    names = list(CORRELATION_COLUMNS)
+    pairs = [(a, b) for i, a in enumerate(names) for b in names[i:]]
+    select = ', '.join(
+        f'corr({CORRELATION_COLUMNS[a]}, {CORRELATION_COLUMNS[b]}) AS "{a}:{b}"'
+        for a, b in pairs
+    )
+
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute(f"SELECT COUNT(*) AS row_count, {select} FROM properties")
+        row = dict(cur.fetchone())
+
+    if row['row_count'] < 2:
+        return {}
+
+    matrix: Dict[str, Dict[str, Any]] = {name: {} for name in names}
+    for a, b in pairs:
+        value = row[f"{a}:{b}"]
+        matrix[a][b] = value
+        matrix[b][a] = value
+    return matrix
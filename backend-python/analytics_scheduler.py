@@ -0,0 +1,193 @@
+"""
+AdminEstate - Analytics Scheduler
+Purpose: Precompute heavy analytics off the request thread
+
+This module provides:
+- AnalyticsScheduler: a daemon thread that reruns registered jobs when one
+  of their tables changes version or their refresh interval elapses
+- Results are published as snapshots in the analytics cache, so endpoints
+  answer immediately with the latest snapshot and its computed_at time
+- Writes made through db.py wake the thread instead of waiting for the
+  next poll
+
+Jobs must list every table their cached inputs depend on, since those
+inputs are pinned to the job's versions while it runs.
+
+Usage:
+    scheduler.register('correlations', ('properties',), get_correlation_matrix)
+    scheduler.start()  # from app startup, not at import
+    snapshot = scheduler.snapshot('correlations')
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import analytics_cache
+import db
+
+ANALYTICS_SCHEDULER_ENABLED = os.getenv('ANALYTICS_SCHEDULER_ENABLED', 'true').lower() == 'true'
+# Seconds between table version checks
+ANALYTICS_SCHEDULER_POLL = float(os.getenv('ANALYTICS_SCHEDULER_POLL', 5))
+# Seconds after which a job reruns even if its tables did not change
+ANALYTICS_REFRESH_INTERVAL = float(os.getenv('ANALYTICS_REFRESH_INTERVAL', 300))
+
+
+class Job:
+    __slots__ = ('name', 'tables', 'compute', 'interval', 'versions', 'last_run',
+                 'last_duration_ms', 'last_error', 'runs')
+
+    def __init__(self, name: str, tables: Sequence[str], compute: Callable[[], Any], interval: float):
+        self.name = name
+        self.tables = tuple(tables)
+        self.compute = compute
+        self.interval = interval
+        self.versions: Optional[Dict[str, int]] = None
+        self.last_run: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+
+    def is_due(self, versions: Dict[str, int], now: float) -> bool:
+        if self.last_run is None or self.versions is None:
+            return True
+        if any(versions.get(table) != self.versions.get(table) for table in self.tables):
+            return True
+        return now - self.last_run >= self.interval
+
+
+class AnalyticsScheduler:
+    """Recomputes registered analytics jobs in a background thread"""
+
+    def __init__(self, cache: analytics_cache.AnalyticsCache,
+                 poll_interval: float = ANALYTICS_SCHEDULER_POLL):
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self._jobs: Dict[str, Job] = {}
+        self._run_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, tables: Sequence[str], compute: Callable[[], Any],
+                 interval: float = ANALYTICS_REFRESH_INTERVAL):
+        """Add a job; compute() must take no arguments"""
+        self._jobs[name] = Job(name, tables, compute, interval)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='analytics-scheduler', daemon=True)
+        self._thread.start()
+        db.add_write_listener(self.wake)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self, table: Optional[str] = None):
+        """Check versions now instead of at the next poll"""
+        self._wake.set()
+
+    def _table_versions(self, jobs) -> Dict[str, int]:
+        tables = sorted({table for job in jobs for table in job.tables})
+        return {table: info['version'] for table, info in db.get_table_versions(tables).items()}
+
+    def _run(self, job: Job, versions: Dict[str, int]):
+        started = time.monotonic()
+        job_versions = {table: versions[table] for table in job.tables}
+        try:
+            # Cached inputs (lease book, properties frame) are reloaded unless
+            # they were loaded at exactly the versions recorded below
+            with analytics_cache.pinned_versions(job_versions):
+                value = job.compute()
+        except Exception as e:
+            job.last_error = str(e)
+            print(f"Error in analytics job {job.name}: {e}")
+        else:
+            self.cache.put_snapshot(job.name, value, job_versions)
+            job.versions = job_versions
+            job.last_error = None
+            job.runs += 1
+        job.last_run = time.monotonic()
+        job.last_duration_ms = (job.last_run - started) * 1000
+
+    def run_pending(self):
+        """Run every job whose tables changed or whose interval elapsed"""
+        with self._run_lock:
+            jobs = list(self._jobs.values())
+            if not jobs:
+                return
+            # Read versions before computing (same reasoning as AnalyticsCache)
+            versions = self._table_versions(jobs)
+            now = time.monotonic()
+            for job in jobs:
+                if job.is_due(versions, now):
+                    self._run(job, versions)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if db.get_pool_stats() is not None:
+                try:
+                    self.run_pending()
+                except Exception as e:
+                    print(f"Error in analytics scheduler: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _is_current(self, job: Job, snapshot: analytics_cache.Snapshot,
+                    versions: Dict[str, int]) -> bool:
+        return all(snapshot.versions.get(table) == versions.get(table) for table in job.tables)
+
+    def snapshot(self, name: str) -> analytics_cache.Snapshot:
+        """
+        Latest snapshot of a job. Before the first background run, or
+        whenever the scheduler is not running and the job's tables changed
+        since the snapshot, the job is computed on the calling thread.
+        """
+        job = self._jobs[name]
+        snapshot = self.cache.get_snapshot(name)
+        if snapshot is not None and self.is_running():
+            return snapshot
+
+        versions = self._table_versions([job])
+        if snapshot is not None and self._is_current(job, snapshot, versions):
+            return snapshot
+
+        with self._run_lock:
+            snapshot = self.cache.get_snapshot(name)
+            if snapshot is None or not self._is_current(job, snapshot, versions):
+                self._run(job, versions)
+                snapshot = self.cache.get_snapshot(name)
+        if snapshot is None:
+            raise RuntimeError(job.last_error or f"Analytics job {name} produced no result")
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'running': self.is_running(),
+            'poll_seconds': self.poll_interval,
+            'jobs': {
+                job.name: {
+                    'tables': list(job.tables),
+                    'interval_seconds': job.interval,
+                    'runs': job.runs,
+                    'seconds_since_run': None if job.last_run is None else round(now - job.last_run, 1),
+                    'last_duration_ms': job.last_duration_ms,
+                    'last_error': job.last_error,
+                }
+                for job in list(self._jobs.values())
+            },
+        }
+
+
+# Shared scheduler publishing into the shared analytics cache
+scheduler = AnalyticsScheduler(analytics_cache.cache)
@@ -2,25 +2,43 @@
 Flask Backend with PostgreSQL - Database-driven AdminEstate backend
 Supports both PostgreSQL and JSON fallback for flexibility
 """
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, make_response, request, send_from_directory
 from flask_cors import CORS
 from flasgger import Swagger
 import json
+import hashlib
+import itertools
+from functools import wraps
 from pathlib import Path
-from datetime import datetime
-import pandas as pd
-import numpy as np
+from datetime import date, datetime, timedelta, timezone
 import os
+import math
 import base64
+import threading
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 import db  # PostgreSQL database module
+import analytics_queries
+import analytics_cache
+import analytics_scheduler
+import change_feed
+import rent_roll
+import forecast
+from json_provider import FastJSONProvider
+from compression import Compressor, etag_variants
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 
+# orjson-backed JSON with native Decimal/date/numpy support
+app.json_provider_class = FastJSONProvider
+app.json = FastJSONProvider(app)
+
+# gzip/brotli for large responses, with compressed bodies cached per ETag
+compressor = Compressor(app)
+
 # Simple CORS configuration
 CORS(app,
      origins=['http://localhost:3000', 'http://127.0.0.1:3000', 'http://localhost:3003', 'http://127.0.0.1:3003'],
@@ -116,6 +134,266 @@ def write_data(data):
         print(f"Error writing data.json: {e}")
         return False
 
+def get_page_args():
+    """Read keyset pagination params (?limit=N&after=<cursor>) from the query string.
+
+    Returns (None, None) when neither is given so existing callers keep
+    receiving the full list. Raises ValueError if limit is not a positive
+    integer, so a malformed page size is a 400 rather than the whole table.
+    """
+    limit = get_number_arg('limit', None, int)
+    if limit is not None and limit < 1:
+        raise ValueError(f"Invalid limit '{limit}' (expected a positive integer)")
+    after = request.args.get('after')
+    if limit is None and not after:
+        return None, None
+    return limit, after
+
+def get_fields_arg():
+    """Read the ?fields=a,b,c column projection (None = all fields)"""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()] or None
+
+def get_date_arg(name):
+    """Read an ISO date (YYYY-MM-DD) query param; raises ValueError if malformed"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} date '{value}' (expected YYYY-MM-DD)")
+
+def get_number_arg(name, default, cast=float):
+    """Read a numeric query param (cast: int or float); raises ValueError if
+    malformed or not finite (float() accepts 'nan' and 'inf')"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    kind = 'an integer' if cast is int else 'a finite number'
+    try:
+        number = cast(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} '{value}' (expected {kind})")
+    if not math.isfinite(number):
+        raise ValueError(f"Invalid {name} '{value}' (expected {kind})")
+    return number
+
+def page_response(rows, next_cursor, **extra):
+    """Build the JSON body for one page of a list endpoint"""
+    return jsonify({
+        'success': True,
+        'data': rows,
+        'count': len(rows),
+        'nextCursor': next_cursor,
+        'hasMore': next_cursor is not None,
+        **extra,
+        'source': 'postgresql'
+    })
+
+# Rows serialized per chunk written to a streaming response
+STREAM_CHUNK_ROWS = 500
+
+def stream_rows_response(rows, fmt='json', filename=None):
+    """Stream an iterator of row dicts as a JSON array or NDJSON.
+
+    Rows are encoded and flushed in chunks of STREAM_CHUNK_ROWS, so neither
+    the full row list nor the full JSON document is ever held in memory.
+    The first row is pulled eagerly so database errors still surface as a
+    normal 500 instead of a truncated 200.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    rows = itertools.chain([first], rows) if first is not None else iter(())
+
+    def encode(row):
+        return app.json.dumps(row)
+
+    def generate_ndjson():
+        chunk = []
+        for row in rows:
+            chunk.append(encode(row))
+            if len(chunk) >= STREAM_CHUNK_ROWS:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+
+    def generate_json_array():
+        yield '['
+        separator = ''
+        chunk = []
+        for row in rows:
+            chunk.append(encode(row))
+            if len(chunk) >= STREAM_CHUNK_ROWS:
+                yield separator + ','.join(chunk)
+                separator = ','
+                chunk = []
+        if chunk:
+            yield separator + ','.join(chunk)
+        yield ']'
+
+    if fmt == 'ndjson':
+        response = Response(generate_ndjson(), mimetype='application/x-ndjson')
+    else:
+        response = Response(generate_json_array(), mimetype='application/json')
+
+    if filename:
+        extension = 'ndjson' if fmt == 'ndjson' else 'json'
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}.{extension}'
+    return response
+
+def conditional_get(*tables):
+    """Serve a GET route with a strong ETag derived from table versions.
+
+    The ETag hashes the request path/query with the current version of every
+    table the route reads (see table_versions in schema.sql). A matching
+    If-None-Match (or an unchanged If-Modified-Since) is answered with 304
+    before the view runs, so an unchanged poll costs one indexed lookup.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                versions = db.get_table_versions(tables)
+            except Exception as e:
+                print(f"Error reading table versions: {e}")
+                return view(*args, **kwargs)
+
+            # Shared with analytics_cache.cached via request_table_versions()
+            g.table_versions = {table: versions[table]['version'] for table in tables}
+            fingerprint = request.full_path + '|' + '|'.join(
+                f"{table}:{versions[table]['version']}" for table in tables
+            )
+            etag = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+            timestamps = [v['updated_at'] for v in versions.values() if v['updated_at']]
+            # Last-Modified is whole seconds (HTTP-date), so it is rounded up:
+            # an echoed If-Modified-Since then covers the exact modification
+            # time. It is only sent once that second has passed, since a
+            # later write in the same second would fall under it too
+            modified_at = max(timestamps) if timestamps else None
+            last_modified = None
+            if modified_at:
+                last_modified = modified_at.replace(microsecond=0)
+                if modified_at.microsecond:
+                    last_modified += timedelta(seconds=1)
+                if last_modified > datetime.now(timezone.utc):
+                    last_modified = None
+
+            if request.if_none_match:
+                # The client may hold the identity or a compressed variant
+                matched = [tag for tag in etag_variants(etag) if request.if_none_match.contains(tag)]
+                not_modified = bool(matched)
+            else:
+                not_modified = bool(last_modified and request.if_modified_since
+                                    and modified_at <= request.if_modified_since)
+
+            if not_modified:
+                response = make_response('', 304)
+                response.set_etag(matched[0] if request.if_none_match else etag)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(etag)
+
+            if last_modified:
+                response.last_modified = last_modified
+            # Let clients cache but always revalidate
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+def request_table_versions():
+    """Table versions conditional_get built this request's ETag from (None outside it)"""
+    return g.get('table_versions')
+
+def cached(key, tables, compute):
+    """analytics_cache.cached pinned to the versions of the response ETag"""
+    return analytics_cache.cached(key, tables, compute, request_table_versions())
+
+def snapshot_response(name):
+    """Serve the latest precomputed snapshot of a scheduler job.
+
+    The ETag identifies the snapshot itself (not the table versions), since a
+    snapshot can lag the tables briefly while the scheduler recomputes.
+    """
+    snapshot = analytics_scheduler.scheduler.snapshot(name)
+    computed_at = snapshot.computed_at.isoformat()
+    etag = hashlib.sha1(f"{request.full_path}|{name}|{computed_at}".encode('utf-8')).hexdigest()
+
+    matched = [tag for tag in etag_variants(etag) if request.if_none_match.contains(tag)]
+    if matched:
+        response = make_response('', 304)
+        response.set_etag(matched[0])
+    else:
+        response = jsonify({
+            'success': True,
+            'data': snapshot.value,
+            'computed_at': computed_at,
+            'source': 'postgresql'
+        })
+        response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+# ===== ANALYTICS PRECOMPUTATION =====
+# Heavy analytics are recomputed by a background thread when their tables
+# change (or every ANALYTICS_REFRESH_INTERVAL seconds) and served as snapshots
+analytics_scheduler.scheduler.register(
+    'correlations', ('properties',), analytics_queries.get_correlation_matrix)
+analytics_scheduler.scheduler.register(
+    'rankings', ('properties',), lambda: analytics_queries.get_top_properties(limit=5))
+analytics_scheduler.scheduler.register(
+    'property_metrics', ('properties', 'transactions'), analytics_queries.get_property_metrics)
+analytics_scheduler.scheduler.register(
+    'forecast', ('tenants',), forecast.get_rent_forecast)
+
+_background_started = threading.Event()
+_background_lock = threading.Lock()
+
+def start_background_services():
+    """Start the analytics scheduler once per process (at app startup, not import)"""
+    if _background_started.is_set():
+        return
+    with _background_lock:
+        if _background_started.is_set():
+            return
+        if analytics_scheduler.ANALYTICS_SCHEDULER_ENABLED:
+            analytics_scheduler.scheduler.start()
+        _background_started.set()
+
+@app.before_request
+def ensure_background_services():
+    # Under a WSGI server there is no __main__; start with the first request
+    start_background_services()
+
+# ===== READ REPLICA ROUTING =====
+# After a write, the client gets a short-lived cookie so its next requests
+# keep reading from the primary until replicas have caught up.
+PRIMARY_PIN_COOKIE = 'ae_primary_until'
+
+@app.before_request
+def restore_read_routing():
+    db.set_primary_until(request.cookies.get(PRIMARY_PIN_COOKIE, default=0.0, type=float))
+
+@app.after_request
+def persist_read_routing(response):
+    if db.REPLICA_DSNS:
+        primary_until = db.get_primary_until()
+        if primary_until > request.cookies.get(PRIMARY_PIN_COOKIE, default=0.0, type=float):
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                f"{primary_until:.3f}",
+                max_age=int(db.READ_YOUR_WRITES_WINDOW) + 1,
+                httponly=True,
+                samesite='Lax'
+            )
+    return response
+
 # ===== HEALTH CHECK =====
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -127,13 +405,103 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/health/db-pool', methods=['GET'])
+def db_pool_stats():
+    """Connection pool utilisation (in use, waiting, wait-time histogram)"""
+    stats = db.get_pool_stats()
+    if stats is None:
+        return jsonify({'success': False, 'error': 'Database connection pool not available'}), 503
+    return jsonify({'success': True, 'data': stats, 'timestamp': datetime.now().isoformat()})
+
+@app.route('/api/health/analytics-cache', methods=['GET'])
+def analytics_cache_stats():
+    """Shared analytics cache counters (entries, hits, misses, invalidations)"""
+    return jsonify({
+        'success': True,
+        'data': {
+            **analytics_cache.cache.stats(),
+            'scheduler': analytics_scheduler.scheduler.stats()
+        },
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/health/change-feed', methods=['GET'])
+def change_feed_stats():
+    """Change feed listener state and subscriber count"""
+    return jsonify({'success': True, 'data': change_feed.feed.stats(), 'timestamp': datetime.now().isoformat()})
+
+# ===== CHANGE FEED (SERVER-SENT EVENTS) =====
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Stream committed changes as Server-Sent Events
+    ---
+    tags:
+      - Events
+    parameters:
+      - in: query
+        name: topics
+        type: string
+        description: Comma-separated tables (messages, work_orders, tenants, properties); default all
+      - in: query
+        name: email
+        type: string
+        description: Only changes concerning this tenant email
+    responses:
+      200:
+        description: >
+          text/event-stream; one event per change named after its table, with
+          data {table, op, id, emails, ...}. A "resync" event means changes may
+          have been missed and the client should refetch.
+      400:
+        description: Unknown topic
+      503:
+        description: Change feed disabled
+    """
+    if not change_feed.CHANGE_FEED_ENABLED:
+        return jsonify({'success': False, 'error': 'Change feed disabled'}), 503
+    try:
+        topics = request.args.get('topics')
+        tables = [topic.strip() for topic in topics.split(',') if topic.strip()] if topics else None
+        subscription = change_feed.feed.subscribe(tables, request.args.get('email') or None)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    def generate():
+        try:
+            yield f"retry: {int(change_feed.CHANGE_FEED_RECONNECT_DELAY * 1000)}\n\n"
+            while True:
+                event = subscription.get(timeout=change_feed.CHANGE_FEED_KEEPALIVE)
+                # Keepalive comments also detect disconnected clients
+                yield ': keepalive\n\n' if event is None else change_feed.format_sse(event)
+        finally:
+            change_feed.feed.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 # ===== PROPERTIES ENDPOINTS =====
 @app.route('/api/properties', methods=['GET'])
+@conditional_get('properties')
 def get_properties():
     """Get all properties from PostgreSQL database
     ---
     tags:
       - Properties
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size (enables keyset pagination)
+      - in: query
+        name: after
+        type: string
+        description: nextCursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
     responses:
       200:
         description: List of all properties
@@ -170,12 +538,19 @@ def get_properties():
               example: postgresql
     """
     try:
-        properties = db.get_all_properties()
+        fields = get_fields_arg()
+        limit, after = get_page_args()
+        if limit is not None or after:
+            return page_response(*db.get_properties_page(limit, after, fields))
+
+        properties = db.get_all_properties(fields)
         return jsonify({
             'success': True,
             'data': properties,
             'source': 'postgresql'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error getting properties: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -259,11 +634,25 @@ def add_property():
 
 # ===== TENANTS ENDPOINTS =====
 @app.route('/api/tenants', methods=['GET'])
+@conditional_get('tenants')
 def get_tenants():
     """Get all tenants from PostgreSQL database
     ---
     tags:
       - Tenants
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size (enables keyset pagination)
+      - in: query
+        name: after
+        type: string
+        description: nextCursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
     responses:
       200:
         description: List of all tenants
@@ -280,12 +669,19 @@ def get_tenants():
               type: string
     """
     try:
-        tenants = db.get_all_tenants()
+        fields = get_fields_arg()
+        limit, after = get_page_args()
+        if limit is not None or after:
+            return page_response(*db.get_tenants_page(limit, after, fields))
+
+        tenants = db.get_all_tenants(fields)
         return jsonify({
             'success': True,
             'data': tenants,
             'source': 'postgresql'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error getting tenants: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -364,11 +760,25 @@ def add_tenant():
 
 # ===== WORK ORDERS ENDPOINTS =====
 @app.route('/api/workorders', methods=['GET'])
+@conditional_get('work_orders')
 def get_workorders():
     """Get all work orders from PostgreSQL database
     ---
     tags:
       - Work Orders
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size (enables keyset pagination)
+      - in: query
+        name: after
+        type: string
+        description: nextCursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
     responses:
       200:
         description: List of all work orders
@@ -383,12 +793,19 @@ def get_workorders():
               type: string
     """
     try:
-        work_orders = db.get_all_work_orders()
+        fields = get_fields_arg()
+        limit, after = get_page_args()
+        if limit is not None or after:
+            return page_response(*db.get_work_orders_page(limit, after, fields))
+
+        work_orders = db.get_all_work_orders(fields)
         return jsonify({
             'success': True,
             'data': work_orders,
             'source': 'postgresql'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error getting work orders: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -437,24 +854,43 @@ def add_workorder():
 
 # ===== TRANSACTIONS ENDPOINTS =====
 @app.route('/api/transactions', methods=['GET'])
+@conditional_get('transactions')
 def get_transactions():
+    """Get all financial transactions
+    ---
+    tags:
+      - Transactions
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size (enables keyset pagination)
+      - in: query
+        name: after
+        type: string
+        description: nextCursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
+    responses:
+      200:
+        description: List of transactions, most recent first
+    """
     try:
-        with db.get_db_cursor(commit=False) as cur:
-            cur.execute("""
-                SELECT id, property_id as "propertyId", property_name as property,
-                       tenant_id as "tenantId", tenant_name as tenant,
-                       amount, type, category, date, description, payment_method as "paymentMethod",
-                       created_at, updated_at
-                FROM transactions
-                ORDER BY date DESC, created_at DESC
-            """)
-            transactions = [dict(row) for row in cur.fetchall()]
+        fields = get_fields_arg()
+        limit, after = get_page_args()
+        if limit is not None or after:
+            return page_response(*db.get_transactions_page(limit, after, fields))
 
+        transactions = db.get_all_transactions(fields)
         return jsonify({
             'success': True,
             'data': transactions,
             'source': 'postgresql'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error getting transactions: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -498,6 +934,7 @@ def add_transaction():
 
 # ===== DOCUMENTS ENDPOINTS =====
 @app.route('/api/documents', methods=['GET'])
+@conditional_get('documents')
 def get_documents():
     try:
         with db.get_db_cursor(commit=False) as cur:
@@ -596,71 +1033,75 @@ def sync_localstorage():
         print(f"Error in sync_localstorage: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-# ===== PANDAS ANALYTICS ENDPOINTS =====
-
-@app.route('/api/analytics/dashboard', methods=['GET'])
-def analytics_dashboard():
-    """Main dashboard analytics using Pandas"""
+# ===== BULK EXPORT ENDPOINTS =====
+@app.route('/api/export/transactions', methods=['GET'])
+def export_transactions():
+    """Stream every transaction using a server-side cursor
+    ---
+    tags:
+      - Transactions
+    parameters:
+      - in: query
+        name: format
+        type: string
+        enum: [json, ndjson]
+        default: json
+    responses:
+      200:
+        description: JSON array (or newline-delimited JSON) of all transactions
+    """
     try:
-        # Get data from PostgreSQL
-        properties = db.get_all_properties()
-        tenants = db.get_all_tenants()
+        fmt = request.args.get('format', 'json')
+        if fmt not in ('json', 'ndjson'):
+            return jsonify({'success': False, 'error': 'format must be json or ndjson'}), 400
 
-        if not properties:
-            return jsonify({
-                'success': True,
-                'data': {
-                    'total_properties': 0,
-                    'total_portfolio_value': 0,
-                    'total_monthly_revenue': 0,
-                    'avg_cap_rate': 0,
-                    'total_units': 0,
-                    'occupied_units': 0,
-                    'vacant_units': 0,
-                    'occupancy_rate': 0,
-                    'avg_property_value': 0,
-                    'avg_revenue_per_property': 0
-                },
-                'source': 'postgresql'
-            })
+        return stream_rows_response(db.stream_transactions(), fmt, filename='transactions')
+    except Exception as e:
+        print(f"Error in export_transactions: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        # Create DataFrame from properties
-        df = pd.DataFrame(properties)
-
-        # Calculate metrics
-        total_properties = len(df)
-        total_portfolio_value = df['purchasePrice'].sum()
-        total_monthly_revenue = df['monthlyRevenue'].sum()
-        total_units = df['units'].sum()
-        occupied_units = df['occupied'].sum()
-        vacant_units = total_units - occupied_units
-        occupancy_rate = (occupied_units / total_units * 100) if total_units > 0 else 0
-
-        # Calculate cap rate (monthly revenue * 12 / purchase price * 100)
-        df['cap_rate'] = df.apply(
-            lambda row: (row['monthlyRevenue'] * 12 / row['purchasePrice'] * 100)
-            if row['purchasePrice'] > 0 else 0,
-            axis=1
-        )
-        avg_cap_rate = df['cap_rate'].mean()
+@app.route('/api/export/messages', methods=['GET'])
+def export_messages():
+    """Stream every message using a server-side cursor
+    ---
+    tags:
+      - Messages
+    parameters:
+      - in: query
+        name: format
+        type: string
+        enum: [json, ndjson]
+        default: json
+      - in: query
+        name: tenantEmail
+        type: string
+    responses:
+      200:
+        description: JSON array (or newline-delimited JSON) of all messages
+    """
+    try:
+        fmt = request.args.get('format', 'json')
+        if fmt not in ('json', 'ndjson'):
+            return jsonify({'success': False, 'error': 'format must be json or ndjson'}), 400
 
-        avg_property_value = df['purchasePrice'].mean()
-        avg_revenue_per_property = df['monthlyRevenue'].mean()
+        tenant_email = request.args.get('tenantEmail')
+        return stream_rows_response(db.stream_messages(tenant_email), fmt, filename='messages')
+    except Exception as e:
+        print(f"Error in export_messages: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# ===== ANALYTICS ENDPOINTS =====
 
+@app.route('/api/analytics/dashboard', methods=['GET'])
+@conditional_get('properties')
+def analytics_dashboard():
+    """Main dashboard analytics (portfolio_rollup, maintained from properties only)"""
+    try:
         return jsonify({
             'success': True,
-            'data': {
-                'total_properties': int(total_properties),
-                'total_portfolio_value': float(total_portfolio_value),
-                'total_monthly_revenue': float(total_monthly_revenue),
-                'avg_cap_rate': float(avg_cap_rate),
-                'total_units': int(total_units),
-                'occupied_units': int(occupied_units),
-                'vacant_units': int(vacant_units),
-                'occupancy_rate': float(occupancy_rate),
-                'avg_property_value': float(avg_property_value),
-                'avg_revenue_per_property': float(avg_revenue_per_property)
-            },
+            'data': cached(
+                'dashboard', ('properties',), analytics_queries.get_dashboard_metrics
+            ),
             'source': 'postgresql'
         })
     except Exception as e:
@@ -668,44 +1109,13 @@ def analytics_dashboard():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/analytics/property-types', methods=['GET'])
+@conditional_get('properties')
 def analytics_property_types():
     """Analytics grouped by property type"""
     try:
-        # Get data from PostgreSQL
-        properties = db.get_all_properties()
-
-        if not properties:
-            return jsonify({'success': True, 'data': {}, 'source': 'postgresql'})
-
-        df = pd.DataFrame(properties)
-
-        # Group by property type
-        grouped = df.groupby('type').agg({
-            'id': 'count',
-            'purchasePrice': 'sum',
-            'monthlyRevenue': 'sum',
-            'units': 'sum',
-            'occupied': 'sum'
-        }).rename(columns={
-            'id': 'property_count',
-            'purchasePrice': 'total_value',
-            'monthlyRevenue': 'total_revenue'
-        })
-
-        # Calculate cap rate per type
-        grouped['avg_cap_rate'] = (grouped['total_revenue'] * 12 / grouped['total_value'] * 100).fillna(0)
-
-        result = {}
-        for property_type, row in grouped.iterrows():
-            result[property_type] = {
-                'property_count': int(row['property_count']),
-                'total_value': float(row['total_value']),
-                'total_revenue': float(row['total_revenue']),
-                'avg_cap_rate': float(row['avg_cap_rate']),
-                'total_units': int(row['units']),
-                'occupied_units': int(row['occupied'])
-            }
-
+        result = cached(
+            'property_types', ('properties',), analytics_queries.get_property_type_breakdown
+        )
         return jsonify({'success': True, 'data': result, 'source': 'postgresql'})
     except Exception as e:
         print(f"Error in analytics_property_types: {e}")
@@ -713,59 +1123,21 @@ def analytics_property_types():
 
 @app.route('/api/analytics/rankings', methods=['GET'])
 def analytics_rankings():
-    """Top performing properties"""
+    """Top performing properties (precomputed snapshot)"""
     try:
-        # Get data from PostgreSQL
-        properties = db.get_all_properties()
-
-        if not properties:
-            return jsonify({'success': True, 'data': {'top_by_value': [], 'top_by_revenue': []}, 'source': 'postgresql'})
-
-        df = pd.DataFrame(properties)
-
-        # Calculate occupancy rate
-        df['occupancy_rate'] = (df['occupied'] / df['units'] * 100).fillna(0)
-
-        # Top by value
-        top_by_value = df.nlargest(5, 'purchasePrice')[['name', 'type', 'units', 'purchasePrice']].to_dict('records')
-
-        # Top by revenue
-        top_by_revenue = df.nlargest(5, 'monthlyRevenue')[['name', 'type', 'monthlyRevenue', 'occupancy_rate']].to_dict('records')
-
-        return jsonify({
-            'success': True,
-            'data': {
-                'top_by_value': top_by_value,
-                'top_by_revenue': top_by_revenue
-            },
-            'source': 'postgresql'
-        })
+        return snapshot_response('rankings')
     except Exception as e:
         print(f"Error in analytics_rankings: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/analytics/portfolio', methods=['GET'])
+@conditional_get('properties', 'tenants')
 def analytics_portfolio():
     """Portfolio-wide analytics"""
     try:
-        # Get data from PostgreSQL
-        properties = db.get_all_properties()
-        tenants = db.get_all_tenants()
-
-        if not properties:
-            return jsonify({'success': True, 'data': {}, 'source': 'postgresql'})
-
-        df = pd.DataFrame(properties)
-
-        portfolio_data = {
-            'total_properties': len(df),
-            'total_value': float(df['purchasePrice'].sum()),
-            'total_revenue': float(df['monthlyRevenue'].sum()),
-            'total_tenants': len(tenants),
-            'property_types': df['type'].nunique(),
-            'avg_units_per_property': float(df['units'].mean())
-        }
-
+        portfolio_data = cached(
+            'portfolio', ('properties', 'tenants'), analytics_queries.get_portfolio_summary
+        )
         return jsonify({'success': True, 'data': portfolio_data, 'source': 'postgresql'})
     except Exception as e:
         print(f"Error in analytics_portfolio: {e}")
@@ -773,30 +1145,198 @@ def analytics_portfolio():
 
 @app.route('/api/analytics/correlations', methods=['GET'])
 def analytics_correlations():
-    """Correlation analysis between metrics"""
+    """Correlation analysis between metrics (PostgreSQL corr(), precomputed snapshot)"""
     try:
-        # Get data from PostgreSQL
-        properties = db.get_all_properties()
+        return snapshot_response('correlations')
+    except Exception as e:
+        print(f"Error in analytics_correlations: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        if not properties or len(properties) < 2:
-            return jsonify({'success': True, 'data': {}, 'source': 'postgresql'})
+@app.route('/api/analytics/occupancy', methods=['GET'])
+@conditional_get('properties', 'tenants')
+def analytics_occupancy():
+    """Per-property occupancy, total rent and tenant counts with a portfolio summary"""
+    try:
+        report = cached(
+            'occupancy', ('properties', 'tenants'), analytics_queries.get_occupancy_report
+        )
+        return jsonify({'success': True, 'data': report, 'source': 'postgresql'})
+    except Exception as e:
+        print(f"Error in analytics_occupancy: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        df = pd.DataFrame(properties)
+@app.route('/api/analytics/workorders', methods=['GET'])
+@conditional_get('work_orders')
+def analytics_workorders():
+    """Work order counts by status/category/priority and resolution-time percentiles"""
+    try:
+        performance = cached(
+            'workorders', ('work_orders',), analytics_queries.get_work_order_performance
+        )
+        return jsonify({'success': True, 'data': performance, 'source': 'postgresql'})
+    except Exception as e:
+        print(f"Error in analytics_workorders: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        # Select numeric columns for correlation
-        numeric_cols = ['units', 'occupied', 'monthlyRevenue', 'purchasePrice']
-        correlation_matrix = df[numeric_cols].corr()
+@app.route('/api/analytics/forecast', methods=['GET'])
+def analytics_forecast():
+    """Projected rent income from lease schedules
+    ---
+    tags:
+      - Analytics
+    parameters:
+      - in: query
+        name: months
+        type: integer
+        default: 12
+      - in: query
+        name: renewalProbability
+        type: number
+        default: 0.7
+      - in: query
+        name: vacancyMonths
+        type: integer
+        default: 2
+        description: Months a unit stays empty when a tenant does not renew
+      - in: query
+        name: rentGrowth
+        type: number
+        default: 0.03
+        description: Annual rent growth applied after lease expiry
+    responses:
+      200:
+        description: Month-by-month contracted, renewal and projected income
+      400:
+        description: Assumption malformed or out of range
+    """
+    try:
+        assumptions = {
+            'months': get_number_arg('months', forecast.DEFAULT_FORECAST_MONTHS, int),
+            'renewal_probability': get_number_arg(
+                'renewalProbability', forecast.DEFAULT_RENEWAL_PROBABILITY),
+            'vacancy_months': get_number_arg('vacancyMonths', forecast.DEFAULT_VACANCY_MONTHS, int),
+            'rent_growth': get_number_arg('rentGrowth', forecast.DEFAULT_RENT_GROWTH),
+        }
+        if assumptions == forecast.DEFAULT_ASSUMPTIONS:
+            # Default assumptions are precomputed by the scheduler
+            return snapshot_response('forecast')
 
-        # Replace NaN with null (valid JSON) and convert to dict
-        correlation_matrix = correlation_matrix.replace({np.nan: None}).to_dict()
+        result = forecast.get_rent_forecast(**assumptions)
+        return jsonify({'success': True, 'data': result, 'source': 'postgresql'})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in analytics_forecast: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        return jsonify({'success': True, 'data': correlation_matrix, 'source': 'postgresql'})
+@app.route('/api/analytics/property-metrics', methods=['GET'])
+def analytics_property_metrics():
+    """Per-property metrics: occupancy, price/revenue per unit, cap rate, NOI, size category
+    (precomputed snapshot)"""
+    try:
+        return snapshot_response('property_metrics')
     except Exception as e:
-        print(f"Error in analytics_correlations: {e}")
+        print(f"Error in analytics_property_metrics: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analytics/trends', methods=['GET'])
+@conditional_get('transactions')
+def analytics_trends():
+    """Income, expense and net per week, month, quarter or year
+    ---
+    tags:
+      - Analytics
+    parameters:
+      - in: query
+        name: period
+        type: string
+        enum: [week, month, quarter, year]
+        default: month
+      - in: query
+        name: start
+        type: string
+        format: date
+      - in: query
+        name: end
+        type: string
+        format: date
+      - in: query
+        name: propertyId
+        type: integer
+    responses:
+      200:
+        description: Aligned labels, income_trend, expense_trend and net_trend arrays
+      400:
+        description: Invalid period, date or propertyId
+    """
+    try:
+        trends = analytics_queries.get_financial_trends(
+            period=request.args.get('period', 'month'),
+            start=get_date_arg('start'),
+            end=get_date_arg('end'),
+            property_id=get_number_arg('propertyId', None, int)
+        )
+        return jsonify({'success': True, 'data': trends, 'source': 'postgresql'})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in analytics_trends: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# ===== RENT ROLL ENDPOINTS =====
+@app.route('/api/rent-roll', methods=['GET'])
+def get_rent_roll():
+    """Rent roll: every tenant with ledger totals, balance and days past due
+    ---
+    tags:
+      - Rent Roll
+    parameters:
+      - in: query
+        name: asOf
+        type: string
+        format: date
+        description: Date days past due are measured from (only today is accepted, the default)
+    responses:
+      200:
+        description: One row per tenant
+    """
+    try:
+        rows = rent_roll.get_rent_roll(as_of=get_date_arg('asOf'))
+        return jsonify({'success': True, 'data': rows, 'count': len(rows), 'source': 'postgresql'})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_rent_roll: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/rent-roll/aging', methods=['GET'])
+def get_rent_roll_aging():
+    """Receivables aging (0-30/31-60/61-90/90+ days) for the whole portfolio
+    ---
+    tags:
+      - Rent Roll
+    parameters:
+      - in: query
+        name: asOf
+        type: string
+        format: date
+        description: Date charges are aged to (only today is accepted, the default)
+    responses:
+      200:
+        description: Bucket totals plus per-tenant breakdown of owing tenants
+    """
+    try:
+        report = rent_roll.get_aging_report(as_of=get_date_arg('asOf'))
+        return jsonify({'success': True, 'data': report, 'source': 'postgresql'})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_rent_roll_aging: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # ===== APPLICATIONS ENDPOINTS =====
 @app.route('/api/applications', methods=['GET'])
+@conditional_get('applications')
 def get_applications():
     """Get all tenant applications with optional filters
     ---
@@ -809,10 +1349,14 @@ def get_applications():
         enum: [screening, approved, rejected, withdrawn]
       - in: query
         name: propertyId
-        type: string
+        type: integer
       - in: query
         name: search
         type: string
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
     responses:
       200:
         description: List of all applications
@@ -829,28 +1373,18 @@ def get_applications():
               type: string
     """
     try:
-        applications = db.get_all_applications()
-
-        # Optional filters (apply in Python for now, can optimize with SQL later)
-        status = request.args.get('status')
-        property_id = request.args.get('propertyId')
-        search = request.args.get('search')
-
-        if status:
-            applications = [a for a in applications if a.get('status') == status]
-
-        if property_id:
-            applications = [a for a in applications if str(a.get('propertyId')) == property_id]
-
-        if search:
-            search_lower = search.lower()
-            applications = [
-                a for a in applications
-                if search_lower in str(a.get('firstName', '')).lower()
-                or search_lower in str(a.get('lastName', '')).lower()
-                or search_lower in str(a.get('email', '')).lower()
-                or search_lower in str(a.get('propertyName', '')).lower()
-            ]
+        # propertyId must be an integer, but is matched as the stored text
+        # (applications.property_id is VARCHAR), so '007' still matches '007'
+        property_id = request.args.get('propertyId') or None
+        get_number_arg('propertyId', None, int)
+
+        # Optional filters (applied in SQL)
+        applications = db.get_all_applications(
+            status=request.args.get('status'),
+            property_id=property_id,
+            search=request.args.get('search'),
+            fields=get_fields_arg()
+        )
 
         return jsonify({
             'success': True,
@@ -858,6 +1392,8 @@ def get_applications():
             'count': len(applications),
             'source': 'postgresql'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_applications: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1031,6 +1567,7 @@ def convert_application_to_tenant(application_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/applications/stats', methods=['GET'])
+@conditional_get('applications')
 def get_application_stats():
     """Get application statistics"""
     try:
@@ -1178,11 +1715,28 @@ def serve_upload(subpath, filename):
         return jsonify({'success': False, 'error': 'File not found'}), 404
 
 @app.route('/api/messages', methods=['GET'])
+@conditional_get('messages')
 def get_messages():
     """Get all messages for AdminEstate Communication Center
     ---
     tags:
       - Messages
+    parameters:
+      - in: query
+        name: tenantEmail
+        type: string
+      - in: query
+        name: limit
+        type: integer
+        description: Page size (enables keyset pagination)
+      - in: query
+        name: after
+        type: string
+        description: nextCursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
     responses:
       200:
         description: List of all messages
@@ -1201,7 +1755,13 @@ def get_messages():
     try:
         # Optional filter by tenant email
         tenant_email = request.args.get('tenantEmail')
-        messages = db.get_all_messages(tenant_email=tenant_email)
+
+        fields = get_fields_arg()
+        limit, after = get_page_args()
+        if limit is not None or after:
+            return page_response(*db.get_messages_page(tenant_email, limit, after, fields))
+
+        messages = db.get_all_messages(tenant_email=tenant_email, fields=fields)
 
         return jsonify({
             'success': True,
@@ -1209,10 +1769,117 @@ def get_messages():
             'count': len(messages),
             'source': 'postgresql'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_messages: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/messages/inbox', methods=['GET'])
+@conditional_get('messages')
+def get_message_inbox():
+    """Get one page of a tenant's or manager's inbox with unread counters
+    ---
+    tags:
+      - Messages
+    parameters:
+      - in: query
+        name: email
+        type: string
+        required: true
+      - in: query
+        name: unread
+        type: boolean
+        description: Only unread messages
+      - in: query
+        name: limit
+        type: integer
+      - in: query
+        name: after
+        type: string
+        description: nextCursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
+    responses:
+      200:
+        description: Messages sent or received by email, newest first
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+            data:
+              type: array
+            count:
+              type: integer
+            nextCursor:
+              type: string
+            hasMore:
+              type: boolean
+            unreadCount:
+              type: integer
+            totalCount:
+              type: integer
+      400:
+        description: Missing email or invalid cursor
+    """
+    try:
+        email = request.args.get('email')
+        if not email:
+            raise ValueError("email is required")
+        unread_only = request.args.get('unread', 'false').lower() == 'true'
+
+        fields = get_fields_arg()
+        limit, after = get_page_args()
+        messages, next_cursor = db.get_inbox_page(email, unread_only, limit, after, fields)
+        counts = db.get_mailbox_counts(email)
+
+        return page_response(messages, next_cursor,
+                             unreadCount=counts['unread'], totalCount=counts['total'])
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_message_inbox: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/messages/unread-count', methods=['GET'])
+@conditional_get('messages')
+def get_unread_count():
+    """Get the unread/total message counters of a mailbox
+    ---
+    tags:
+      - Messages
+    parameters:
+      - in: query
+        name: email
+        type: string
+        required: true
+    responses:
+      200:
+        description: Mailbox counters
+      400:
+        description: Missing email
+    """
+    try:
+        email = request.args.get('email')
+        if not email:
+            raise ValueError("email is required")
+
+        counts = db.get_mailbox_counts(email)
+        return jsonify({
+            'success': True,
+            'unreadCount': counts['unread'],
+            'totalCount': counts['total'],
+            'source': 'postgresql'
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_unread_count: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/messages/send', methods=['POST'])
 def send_message():
     """Send a general message (manager to tenant or tenant to manager)"""
@@ -1272,6 +1939,68 @@ def mark_message_read(message_id):
         print(f"Error in mark_message_read: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/messages/<int:message_id>/thread', methods=['GET'])
+@conditional_get('messages')
+def get_message_thread(message_id):
+    """Get the whole conversation a message belongs to
+    ---
+    tags:
+      - Messages
+    parameters:
+      - in: path
+        name: message_id
+        type: integer
+        required: true
+        description: Any message of the thread
+      - in: query
+        name: maxDepth
+        type: integer
+        description: Reply levels to return below the root (0 = root only)
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
+    responses:
+      200:
+        description: Thread messages depth-first from the root, each with its depth
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+            rootId:
+              type: integer
+            data:
+              type: array
+            count:
+              type: integer
+            truncated:
+              type: boolean
+      400:
+        description: Malformed or negative maxDepth
+      404:
+        description: Message not found
+    """
+    try:
+        max_depth = get_number_arg('maxDepth', None, int)
+        thread = db.get_message_thread(message_id, max_depth, get_fields_arg())
+        if thread is None:
+            return jsonify({'success': False, 'error': 'Message not found'}), 404
+
+        return jsonify({
+            'success': True,
+            'rootId': thread['rootId'],
+            'data': thread['messages'],
+            'count': len(thread['messages']),
+            'truncated': thread['truncated'],
+            'source': 'postgresql'
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_message_thread: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/tenant/maintenance', methods=['POST'])
 def tenant_submit_maintenance():
     """Tenant submits a maintenance request - creates message with metadata for approval"""
@@ -1323,23 +2052,11 @@ def tenant_submit_maintenance():
 @app.route('/api/maintenance/approve/<int:message_id>', methods=['POST'])
 def approve_maintenance_request(message_id):
     """Approve a maintenance request message and convert it to a work order"""
-    try:
-        # Find the maintenance request message from PostgreSQL
-        messages = db.get_all_messages()
-        message = next((msg for msg in messages if msg.get('id') == message_id and msg.get('type') == 'maintenance_request'), None)
-
-        if not message:
-            return jsonify({'success': False, 'error': 'Maintenance request not found'}), 404
-
-        if message.get('status') == 'approved':
-            return jsonify({'success': False, 'error': 'Request already approved'}), 400
-
+    def build_work_order(message):
         # Create work order from maintenance request
-        maintenance_data = message.get('maintenanceData', {})
-        work_order_id = int(datetime.now().timestamp() * 1000)
-
-        new_work_order = {
-            'id': work_order_id,
+        maintenance_data = message.get('maintenanceData') or {}
+        return {
+            'id': int(datetime.now().timestamp() * 1000),
             'property': message.get('property', 'Sunset Apartments'),
             'tenant': message.get('from', 'Tenant'),
             'unit': message.get('unit', 'A101'),
@@ -1359,14 +2076,10 @@ def approve_maintenance_request(message_id):
             'approvedAt': datetime.now().isoformat()
         }
 
-        # Create work order in PostgreSQL
-        db.create_work_order(new_work_order)
-
-        # Update the message status and link to work order
-        db.update_message_status(message_id, 'approved', work_order_id)
-
-        # Create a reply message to notify the tenant
-        approval_message = {
+    def build_notification(message, work_order):
+        # Reply message to notify the tenant
+        work_order_id = work_order['id']
+        return {
             'id': int(datetime.now().timestamp() * 1000) + 1,
             'from': 'Property Manager',
             'fromEmail': 'manager@adminestate.com',
@@ -1385,8 +2098,15 @@ def approve_maintenance_request(message_id):
             'sentAt': datetime.now().isoformat()
         }
 
-        db.create_message(approval_message)
+    try:
+        # Work order, message status and notification commit together, with
+        # the request message locked against concurrent approvals
+        result = db.approve_maintenance_request(message_id, build_work_order, build_notification)
 
+        if result is None:
+            return jsonify({'success': False, 'error': 'Maintenance request not found'}), 404
+
+        new_work_order, approval_message = result
         return jsonify({
             'success': True,
             'data': {
@@ -1397,6 +2117,8 @@ def approve_maintenance_request(message_id):
             'source': 'postgresql'
         })
 
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error in approve_maintenance_request: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1405,47 +2127,13 @@ def approve_maintenance_request(message_id):
 def tenant_get_maintenance():
     """Get tenant's maintenance requests (both messages and work orders)"""
     try:
-        # Get all messages and work orders from PostgreSQL
-        messages = db.get_all_messages()
-        work_orders = db.get_all_work_orders()
-
         # Get tenant ID from query params (in production, get from JWT token)
-        tenant_name = request.args.get('tenantName')
-        unit = request.args.get('unit')
-
-        # Filter maintenance request messages
-        if tenant_name:
-            tenant_messages = [msg for msg in messages if msg.get('from') == tenant_name and msg.get('type') == 'maintenance_request']
-        elif unit:
-            tenant_messages = [msg for msg in messages if msg.get('unit') == unit and msg.get('type') == 'maintenance_request']
-        else:
-            tenant_messages = [msg for msg in messages if msg.get('type') == 'maintenance_request']
-
-        # For each message, get the linked work order if it exists
-        results = []
-        for msg in tenant_messages:
-            item = {
-                'id': msg.get('id'),
-                'title': msg.get('maintenanceData', {}).get('title', 'Maintenance Request'),
-                'description': msg.get('message'),
-                'category': msg.get('maintenanceData', {}).get('category'),
-                'priority': msg.get('maintenanceData', {}).get('priority'),
-                'status': msg.get('status', 'pending_approval'),
-                'submittedAt': msg.get('submittedAt'),
-                'approvedAt': msg.get('approvedAt'),
-                'workOrderId': msg.get('workOrderId'),
-                'location': msg.get('maintenanceData', {}).get('location'),
-                'photos': msg.get('maintenanceData', {}).get('photos', [])
-            }
-
-            # If approved, get work order details
-            if msg.get('workOrderId'):
-                work_order = next((wo for wo in work_orders if wo.get('id') == msg.get('workOrderId')), None)
-                if work_order:
-                    item['workOrderStatus'] = work_order.get('status')
-                    item['workOrderDate'] = work_order.get('date')
-
-            results.append(item)
+        # Messages are joined to their work orders in a single query
+        results = db.get_tenant_maintenance_requests(
+            tenant_name=request.args.get('tenantName'),
+            unit=request.args.get('unit'),
+            tenant_email=request.args.get('tenantEmail')
+        )
 
         return jsonify({
             'success': True,
@@ -1480,7 +2168,8 @@ def tenant_get_maintenance_detail(request_id):
 if __name__ == '__main__':
     print("Starting AdminEstate Flask Backend with PostgreSQL")
     print("Database: PostgreSQL (Docker container)")
-    print("Connection pool: 1-10 connections")
+    print(f"Connection pool: {db.POOL_MIN_CONN}-{db.POOL_MAX_CONN} connections")
     print("UI <-> Flask API <-> PostgreSQL Database")
     print("Swagger UI: http://localhost:5000/api-docs/")
+    start_background_services()
     app.run(debug=False, port=5000, host='localhost')
\ No newline at end of file
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+AdminEstate - Rent Forecast Benchmark
+Purpose: Time forecast.project_income over synthetic lease books
+
+Usage:
+    python benchmarks/bench_forecast.py [--leases 10000,50000,200000] [--months 36]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import forecast  # noqa: E402
+
+
+def make_leases(count):
+    """Month offsets like forecast._month_offsets produces (some open-ended)"""
+    rng = np.random.default_rng(0)
+    start = rng.integers(-36, 6, count).astype('float64')
+    end = start + rng.choice([6, 12, 24], count)
+    end[rng.random(count) < 0.05] = np.nan
+    return rng.uniform(800, 3500, count), start, end
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--leases', default='10000,50000,200000')
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Rent forecast, {args.months} months, best of {args.repeat}")
+    for count in (int(value) for value in args.leases.split(',')):
+        rent, start, end = make_leases(count)
+        timings = []
+        for _ in range(args.repeat):
+            begin = time.perf_counter()
+            forecast.project_income(rent, start, end, args.months, 0.7, 2, 0.03)
+            timings.append(time.perf_counter() - begin)
+        print(f"  {count:>8} leases  {min(timings) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
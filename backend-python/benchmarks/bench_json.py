@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+AdminEstate - JSON Encoding Micro-benchmark
+Purpose: Compare Flask's default JSON provider with FastJSONProvider
+
+Both providers are timed through the same calls the app makes:
+- dumps:    provider.dumps(payload) -> str
+- response: provider.response(payload), as jsonify() does for every route
+
+Payloads mirror real responses:
+- transactions: list endpoint rows (Decimal amounts, dates, timestamps)
+- applications: wide rows with nested JSONB fields
+- analytics: numpy scalars/arrays as produced by the pandas routes
+
+Usage:
+    python benchmarks/bench_json.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json_provider  # noqa: E402
+from json_provider import FastJSONProvider  # noqa: E402
+
+
+def make_transactions(rows):
+    """Rows shaped like db.get_all_transactions()"""
+    start = datetime(2024, 1, 1, 9, 30)
+    return [
+        {
+            'id': i,
+            'propertyId': 1000 + i % 250,
+            'property': f"Property {i % 250}",
+            'tenantId': 5000 + i % 4000,
+            'tenant': f"Tenant {i % 4000}",
+            'amount': Decimal('1250.00') + Decimal(i % 97),
+            'type': 'income' if i % 3 else 'expense',
+            'category': 'rent',
+            'date': (start + timedelta(days=i % 730)).date(),
+            'description': 'Monthly rent payment',
+            'paymentMethod': 'ach',
+            'created_at': start + timedelta(minutes=i),
+        }
+        for i in range(rows)
+    ]
+
+
+def make_applications(rows):
+    """Rows shaped like db.get_all_applications() (JSONB columns included)"""
+    return [
+        {
+            'id': i,
+            'status': 'screening',
+            'submittedDate': datetime(2025, 3, 1, 12, 0),
+            'firstName': 'Jane',
+            'lastName': f"Doe{i}",
+            'email': f"jane{i}@example.com",
+            'monthlyIncome': Decimal('5400.00'),
+            'currentAddress': {'street': '1 Main St', 'city': 'Springfield', 'zip': '12345'},
+            'previousAddresses': [{'street': '2 Oak Ave', 'city': 'Shelbyville', 'years': 3}],
+            'occupants': [{'name': 'Sam', 'age': 7}],
+            'pets': [{'type': 'dog', 'weight': 30}],
+            'vehicles': [],
+            'documents': [{'name': 'paystub.pdf', 'size': 120443}],
+            'desiredMoveInDate': date(2025, 6, 1),
+        }
+        for i in range(rows)
+    ]
+
+
+def make_analytics(rows):
+    """Dict of numpy values like the /api/analytics/* routes build"""
+    values = np.random.default_rng(0).random(rows)
+    return {
+        'total_properties': np.int64(rows),
+        'total_portfolio_value': np.float64(values.sum() * 1e6),
+        'avg_cap_rate': np.float64(values.mean() * 10),
+        'cap_rates': values,
+        'correlations': {
+            column: {other: np.float64(0.5) for other in ('units', 'occupied', 'monthlyRevenue')}
+            for column in ('units', 'occupied', 'monthlyRevenue')
+        },
+    }
+
+
+def coerce_for_default(obj):
+    """What routes had to do by hand before: float()/int()/tolist() numpy values"""
+    if isinstance(obj, dict):
+        return {key: coerce_for_default(value) for key, value in obj.items()}
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def bench(label, func, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(func())
+        timings.append(time.perf_counter() - start)
+    best = min(timings) * 1000
+    print(f"  {label:<28} {best:9.2f} ms   {size / 1024:9.1f} KiB")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    backend = 'orjson' if json_provider.orjson is not None else 'stdlib fallback'
+
+    payloads = {
+        'transactions': make_transactions(args.rows),
+        'applications': make_applications(args.rows),
+        'analytics': make_analytics(args.rows),
+    }
+
+    print(f"JSON encode benchmark: {args.rows} rows, best of {args.repeat} (FastJSONProvider: {backend})")
+    with app.app_context():
+        for name, payload in payloads.items():
+            print(f"\n{name}")
+            default_payload = coerce_for_default(payload) if name == 'analytics' else payload
+            for call in ('dumps', 'response'):
+                if call == 'dumps':
+                    run_default = lambda: default_provider.dumps(default_payload)
+                    run_fast = lambda: fast_provider.dumps(payload)
+                else:
+                    run_default = lambda: default_provider.response(default_payload).get_data()
+                    run_fast = lambda: fast_provider.response(payload).get_data()
+                baseline = bench(f'DefaultJSONProvider.{call}', run_default, args.repeat)
+                fast = bench(f'FastJSONProvider.{call}', run_fast, args.repeat)
+                print(f"  {call} speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+AdminEstate - Metric Kernel Benchmark
+Purpose: Compare row-wise DataFrame.apply with the metrics.py kernels
+
+For each portfolio size the same metrics are computed two ways:
+- apply:   one Python call per row (df.apply(..., axis=1)), as the old
+           analytics routes did for cap rate
+- kernels: metrics.property_metrics (NumPy, whole columns at once)
+
+Row-wise apply is skipped above --apply-max rows (it takes minutes at 1M).
+
+Usage:
+    python benchmarks/bench_metrics.py [--sizes 1000,100000,1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import metrics  # noqa: E402
+
+
+def make_properties(rows):
+    """Typed frame shaped like analytics_cache.get_properties_frame()"""
+    rng = np.random.default_rng(0)
+    units = rng.integers(0, 120, rows).astype('float64')
+    df = pd.DataFrame({
+        'units': units,
+        'occupied': np.floor(units * rng.random(rows)),
+        'monthlyRevenue': rng.uniform(0, 50_000, rows),
+        'purchasePrice': rng.uniform(0, 5_000_000, rows),
+    })
+    # Sprinkle missing values and zero prices like real data
+    df.loc[df.sample(frac=0.01, random_state=1).index, 'monthlyRevenue'] = np.nan
+    df.loc[df.sample(frac=0.01, random_state=2).index, 'purchasePrice'] = 0
+    return df
+
+
+def row_metrics(row):
+    units = row['units']
+    price = row['purchasePrice']
+    revenue = row['monthlyRevenue']
+    return pd.Series({
+        'occupancy_rate': row['occupied'] / units * 100 if units else 0,
+        'price_per_unit': price / units if units else 0,
+        'revenue_per_unit': revenue / units if units else 0,
+        'cap_rate_estimate': revenue * 12 / price * 100 if price > 0 else 0,
+    })
+
+
+def bench(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--apply-max', type=int, default=100000)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    print(f"Metric kernels vs row-wise apply, best of {args.repeat}")
+    print(f"  {'rows':>10} {'apply ms':>12} {'kernels ms':>12} {'speedup':>9} {'ns/row':>8}")
+
+    for rows in sizes:
+        df = make_properties(rows)
+        kernels = bench(lambda: metrics.property_metrics(df), args.repeat)
+        if rows <= args.apply_max:
+            applied = bench(lambda: df.apply(row_metrics, axis=1), 1)
+            apply_col = f"{applied:12.1f}"
+            speedup_col = f"{applied / kernels:8.0f}x"
+        else:
+            apply_col = f"{'skipped':>12}"
+            speedup_col = f"{'-':>9}"
+        print(f"  {rows:>10} {apply_col} {kernels:12.2f} {speedup_col} {kernels * 1e6 / rows:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+AdminEstate - Change Feed
+Purpose: Push committed database changes to clients over Server-Sent Events
+
+This module provides:
+- ChangeFeed: one daemon thread per process that LISTENs on the
+  'adminestate_changes' channel (see the CHANGE FEED section of schema.sql)
+  over its own dedicated connection, outside the request pool
+- Subscriptions with per-topic filtering (tables and/or one person's email)
+  and a bounded queue each, so a slow client never blocks the listener
+- A 'resync' event when a client may have missed changes (its queue
+  overflowed or the listener had to reconnect); the client should then
+  refetch instead of applying deltas
+
+Payloads are compact ({'table', 'op', 'id', 'emails', ...}); clients fetch
+the changed row through the regular endpoints.
+
+Usage:
+    subscription = feed.subscribe(tables={'messages'}, email='jane@example.com')
+    event = subscription.get(timeout=15)
+    feed.unsubscribe(subscription)
+"""
+
+import itertools
+import json
+import os
+import queue
+import select
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+import db
+
+CHANGE_FEED_CHANNEL = 'adminestate_changes'
+CHANGE_FEED_TOPICS = ('messages', 'work_orders', 'tenants', 'properties')
+
+CHANGE_FEED_ENABLED = os.getenv('CHANGE_FEED_ENABLED', 'true').lower() == 'true'
+# Events buffered per client before it is told to resync
+CHANGE_FEED_QUEUE_SIZE = int(os.getenv('CHANGE_FEED_QUEUE_SIZE', 100))
+# Seconds between SSE keepalive comments on an idle stream
+CHANGE_FEED_KEEPALIVE = float(os.getenv('CHANGE_FEED_KEEPALIVE', 15))
+# Seconds to wait before reconnecting a lost listener connection
+CHANGE_FEED_RECONNECT_DELAY = float(os.getenv('CHANGE_FEED_RECONNECT_DELAY', 2))
+
+
+class Subscription:
+    """One SSE client: its filter and pending events"""
+
+    def __init__(self, tables: Optional[Iterable[str]] = None, email: Optional[str] = None,
+                 queue_size: int = CHANGE_FEED_QUEUE_SIZE):
+        self.tables = frozenset(tables) if tables else None
+        self.email = email
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._resync = threading.Event()
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.tables is not None and event.get('table') not in self.tables:
+            return False
+        if self.email is not None and self.email not in event.get('emails', ()):
+            return False
+        return True
+
+    def put(self, event: Dict[str, Any]):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.request_resync()
+
+    def request_resync(self):
+        self._resync.set()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Next event for this client, or None after timeout.
+
+        A pending resync is returned first and replaces whatever was queued,
+        since the client is about to refetch anyway.
+        """
+        if not self._resync.is_set():
+            try:
+                return self._queue.get(timeout=timeout)
+            except queue.Empty:
+                if not self._resync.is_set():
+                    return None
+        self._resync.clear()
+        with self._queue.mutex:
+            self._queue.queue.clear()
+        return {'table': None, 'op': 'resync'}
+
+
+class ChangeFeed:
+    """LISTENs for change notifications and fans them out to subscribers"""
+
+    def __init__(self, channel: str = CHANGE_FEED_CHANNEL,
+                 reconnect_delay: float = CHANGE_FEED_RECONNECT_DELAY):
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._conn = None
+        self._event_ids = itertools.count(1)
+        self.received = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='change-feed', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def subscribe(self, tables: Optional[Iterable[str]] = None,
+                  email: Optional[str] = None) -> Subscription:
+        """
+        Register a client. The listener thread starts with the first one.
+
+        Raises:
+            ValueError: Unknown table in tables
+        """
+        tables = list(tables or [])
+        unknown = [table for table in tables if table not in CHANGE_FEED_TOPICS]
+        if unknown:
+            raise ValueError(f"Unknown topic(s): {', '.join(unknown)}")
+
+        subscription = Subscription(tables, email)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        self.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event: Dict[str, Any]):
+        """Hand one change to every matching subscriber"""
+        event['eventId'] = next(self._event_ids)
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.matches(event):
+                subscription.put(event)
+
+    def _resync_all(self):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.request_resync()
+
+    def _connect(self):
+        # Dedicated connection: LISTEN is per session, so it cannot live in the pool
+        conn = psycopg2.connect(**db.DB_CONFIG)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        return conn
+
+    def _drain(self, conn):
+        conn.poll()
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                print(f"Error in change feed: invalid payload {notify.payload[:200]!r}")
+                continue
+            self.received += 1
+            self.publish(event)
+
+    def _loop(self):
+        connected_before = False
+        while not self._stop.is_set():
+            try:
+                self._conn = self._connect()
+                if connected_before:
+                    # Notifications sent while disconnected are lost
+                    self.reconnects += 1
+                    self._resync_all()
+                connected_before = True
+                self.last_error = None
+
+                while not self._stop.is_set():
+                    # Wake up periodically to notice stop()
+                    readable, _, _ = select.select([self._conn], [], [], 1.0)
+                    if readable:
+                        self._drain(self._conn)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error in change feed listener: {e}")
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if self._conn is not None:
+                    try:
+                        self._conn.close()
+                    except Exception:
+                        pass
+                    self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscribers = len(self._subscriptions)
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'connected': self._conn is not None and not self._conn.closed,
+            'subscribers': subscribers,
+            'received': self.received,
+            'reconnects': self.reconnects,
+            'last_error': self.last_error,
+        }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode one event as a Server-Sent Events message"""
+    name = 'resync' if event.get('op') == 'resync' else event['table']
+    lines = [f"event: {name}", f"data: {json.dumps(event, separators=(',', ':'))}"]
+    if 'eventId' in event:
+        lines.insert(0, f"id: {event['eventId']}")
+    return '\n'.join(lines) + '\n\n'
+
+
+# Shared by all /api/events streams in this process
+feed = ChangeFeed()
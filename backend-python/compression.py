@@ -0,0 +1,163 @@
+"""
+AdminEstate - Response Compression
+Purpose: gzip/brotli compression for large API responses
+
+This module provides:
+- Accept-Encoding negotiation (br when the brotli package is installed, else gzip)
+- A size threshold so small responses are sent as-is
+- An LRU cache of compressed bodies keyed by ETag, so repeated polls of an
+  unchanged table version (see conditional_get in app_simplex.py) reuse the
+  compressed bytes instead of compressing the same payload again
+
+Usage:
+    compressor = Compressor(app)
+"""
+
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this (bytes) are not worth compressing
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+# Precompressed body cache bounds
+COMPRESS_CACHE_ENTRIES = int(os.getenv('COMPRESS_CACHE_ENTRIES', 256))
+COMPRESS_CACHE_MAX_BYTES = int(os.getenv('COMPRESS_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+}
+
+
+def supported_encodings() -> List[str]:
+    """Content encodings this server can produce, in preference order"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def etag_variants(etag: str) -> List[str]:
+    """All ETags a client may hold for one representation (identity + encoded)"""
+    return [etag] + [f"{etag}-{encoding}" for encoding in supported_encodings()]
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU cache of compressed bodies, bounded by entries and bytes"""
+
+    def __init__(self, max_entries: int = COMPRESS_CACHE_ENTRIES,
+                 max_bytes: int = COMPRESS_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Tuple[str, str], body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = body
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class Compressor:
+    """Flask extension that compresses eligible responses in after_request"""
+
+    def __init__(self, app=None, min_size: int = COMPRESS_MIN_SIZE):
+        self.min_size = min_size
+        self.cache = CompressedBodyCache()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+        app.extensions['compressor'] = self
+
+    def _choose_encoding(self) -> Optional[str]:
+        accepted = request.accept_encodings
+        for encoding in supported_encodings():
+            if accepted[encoding] > 0:
+                return encoding
+        return None
+
+    def after_request(self, response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        encoding = self._choose_encoding()
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        etag, is_weak = response.get_etag()
+        cache_key = (etag, encoding) if etag and not is_weak else None
+
+        body = self.cache.get(cache_key) if cache_key else None
+        if body is None:
+            body = _compress(data, encoding)
+            if cache_key:
+                self.cache.put(cache_key, body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            # A strong ETag identifies exact bytes, so each encoding gets its own
+            response.set_etag(f"{etag}-{encoding}", weak=is_weak)
+        return response
@@ -12,11 +12,20 @@ This module provides:
 
 import os
 import json
+import math
+import base64
+import uuid
+import time
+import threading
+import itertools
 from contextlib import contextmanager
-from typing import Dict, List, Any, Optional
+from contextvars import ContextVar
+from typing import Dict, List, Any, Callable, Iterator, Optional, Sequence, Tuple
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.pool
 from psycopg2.extras import RealDictCursor, Json, execute_batch
-from psycopg2.pool import SimpleConnectionPool
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -31,21 +40,290 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', 5432))
 }
 
+# Keyset pagination limits (?limit= on list endpoints)
+DEFAULT_PAGE_SIZE = int(os.getenv('DB_DEFAULT_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.getenv('DB_MAX_PAGE_SIZE', 500))
+
+# Rows fetched per round trip by server-side (streaming) cursors
+STREAM_ITERSIZE = int(os.getenv('DB_STREAM_ITERSIZE', 2000))
+
+# Connection pool sizing and behaviour (size to gunicorn workers x threads)
+POOL_MIN_CONN = int(os.getenv('DB_POOL_MIN', 1))
+POOL_MAX_CONN = int(os.getenv('DB_POOL_MAX', 10))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))                # seconds to wait for a free connection
+POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', 1800))    # seconds before a connection is recycled
+POOL_HEALTH_CHECK_IDLE = float(os.getenv('DB_POOL_HEALTH_CHECK_IDLE', 30))  # ping connections idle longer than this
+
+# Optional read replicas: comma-separated libpq DSNs, e.g.
+# DB_REPLICA_DSNS="host=replica1 dbname=adminestate user=readonly,host=replica2 ..."
+REPLICA_DSNS = [dsn.strip() for dsn in os.getenv('DB_REPLICA_DSNS', '').split(',') if dsn.strip()]
+REPLICA_POOL_MAX_CONN = int(os.getenv('DB_REPLICA_POOL_MAX', POOL_MAX_CONN))
+# After a write, reads stay on the primary this long (seconds) so the
+# writer never sees replica lag
+READ_YOUR_WRITES_WINDOW = float(os.getenv('DB_READ_YOUR_WRITES_WINDOW', 5))
+
+# Server-side prepared statements for hot lookups (disable behind
+# transaction-pooling proxies such as PgBouncer, which do not keep sessions)
+USE_PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'true').lower() in ('1', 'true', 'yes')
+
+
+# =============================================================================
+# CONNECTION POOL
+# =============================================================================
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes free within the pool timeout"""
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection that remembers which statements it has PREPAREd.
+
+    The registry lives on the connection itself, so when the pool closes or
+    recycles a connection its prepared statements are forgotten with it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool.
+
+    Unlike psycopg2's SimpleConnectionPool this is safe to share between
+    Flask request threads, waits (up to `timeout`) for a connection instead
+    of failing when exhausted, keeps up to `max_conn` idle connections open,
+    pings connections that sat idle before handing them out, and recycles
+    connections older than `max_lifetime`.
+
+    getconn()/putconn() match the psycopg2 pool API.
+    """
+
+    # Upper bounds (ms) of the checkout wait-time histogram buckets
+    WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self, min_conn: int, max_conn: int, timeout: float = POOL_TIMEOUT,
+                 max_lifetime: float = POOL_MAX_LIFETIME,
+                 health_check_idle: float = POOL_HEALTH_CHECK_IDLE, **connect_kwargs):
+        self.min_conn = min_conn
+        self.max_conn = max_conn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_idle = health_check_idle
+        self.closed = False
+
+        self._connect_kwargs = connect_kwargs
+        self._cond = threading.Condition()
+        self._idle = []          # LIFO stack of idle connections
+        self._created = {}       # id(conn) -> monotonic time the connection was opened
+        self._last_used = {}     # id(conn) -> monotonic time the connection was returned
+        self._size = 0           # open connections plus reserved slots being opened
+        self._in_use = 0
+        self._waiting = 0
+
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'connections_opened': 0,
+            'connections_recycled': 0,
+            'health_check_failures': 0,
+            'wait_time_total_ms': 0.0,
+            'wait_time_max_ms': 0.0,
+        }
+        self._wait_histogram = [0] * (len(self.WAIT_BUCKETS_MS) + 1)
+
+        for _ in range(min_conn):
+            self._size += 1
+            self._idle.append(self._connect())
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._connect_kwargs)
+        now = time.monotonic()
+        with self._cond:
+            self._created[id(conn)] = now
+            self._last_used[id(conn)] = now
+            self._stats['connections_opened'] += 1
+        return conn
+
+    def _close(self, conn):
+        self._created.pop(id(conn), None)
+        self._last_used.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _expired(self, conn) -> bool:
+        created = self._created.get(id(conn), 0)
+        return time.monotonic() - created > self.max_lifetime
+
+    def _healthy(self, conn) -> bool:
+        """Cheap state check; round-trip ping only if the connection sat idle"""
+        if conn.closed or self._expired(conn):
+            return False
+        if conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+
+        idle_for = time.monotonic() - self._last_used.get(id(conn), 0)
+        if idle_for < self.health_check_idle:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _record_wait(self, wait_ms: float):
+        self._stats['checkouts'] += 1
+        self._stats['wait_time_total_ms'] += wait_ms
+        self._stats['wait_time_max_ms'] = max(self._stats['wait_time_max_ms'], wait_ms)
+        for index, bound in enumerate(self.WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self._wait_histogram[index] += 1
+                return
+        self._wait_histogram[-1] += 1
+
+    def getconn(self):
+        """Check out a healthy connection, waiting up to `timeout` seconds"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self.closed:
+                        raise psycopg2.pool.PoolError("connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_conn:
+                        # Reserve a slot; the connection is opened outside the lock
+                        self._size += 1
+                        conn = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.timeout:.1f}s "
+                            f"({self.max_conn} in use)"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            self._in_use += 1
+            self._record_wait((time.monotonic() - start) * 1000)
+
+        try:
+            if conn is not None and not self._healthy(conn):
+                with self._cond:
+                    if self._expired(conn):
+                        self._stats['connections_recycled'] += 1
+                    else:
+                        self._stats['health_check_failures'] += 1
+                self._close(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection; broken or expired connections are closed"""
+        if not conn.closed and not close:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+
+        with self._cond:
+            self._in_use -= 1
+            expired = self._expired(conn)
+            if close or conn.closed or expired or self.closed:
+                if expired:
+                    self._stats['connections_recycled'] += 1
+                self._size -= 1
+                self._close(conn)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def closeall(self):
+        """Close idle connections; in-use ones are closed when returned"""
+        with self._cond:
+            self.closed = True
+            for conn in self._idle:
+                self._size -= 1
+                self._close(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool utilisation and checkout wait times"""
+        with self._cond:
+            buckets = [f"<={bound}ms" for bound in self.WAIT_BUCKETS_MS]
+            buckets.append(f">{self.WAIT_BUCKETS_MS[-1]}ms")
+            checkouts = self._stats['checkouts']
+            return {
+                'min_conn': self.min_conn,
+                'max_conn': self.max_conn,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                **self._stats,
+                'wait_time_avg_ms': self._stats['wait_time_total_ms'] / checkouts if checkouts else 0.0,
+                'wait_time_histogram': dict(zip(buckets, self._wait_histogram)),
+            }
+
+
 # Connection pool (lazy initialization)
-_connection_pool: Optional[SimpleConnectionPool] = None
+_connection_pool: Optional[ConnectionPool] = None
+
+# Read replica pools, chosen round-robin for read-only work
+_replica_pools: List[ConnectionPool] = []
+_replica_counter = itertools.count()
+
+# Wall-clock time until which reads in this context must use the primary
+_primary_until: ContextVar[float] = ContextVar('primary_until', default=0.0)
 
+# Callbacks run with a table name after a write to that table commits
+_write_listeners: List[Callable[[str], None]] = []
 
-def init_connection_pool(min_conn=1, max_conn=10):
-    """Initialize the connection pool"""
+
+def init_connection_pool(min_conn=None, max_conn=None):
+    """Initialize the connection pool (sizes default to DB_POOL_MIN/DB_POOL_MAX)"""
     global _connection_pool
 
     if _connection_pool is not None:
         return
 
+    min_conn = POOL_MIN_CONN if min_conn is None else min_conn
+    max_conn = POOL_MAX_CONN if max_conn is None else max_conn
+
     try:
-        _connection_pool = SimpleConnectionPool(
+        _connection_pool = ConnectionPool(
             min_conn,
             max_conn,
+            connection_factory=PooledConnection,
             **DB_CONFIG
         )
         print(f"[OK] Database connection pool initialized ({min_conn}-{max_conn} connections)")
@@ -53,24 +331,109 @@ def init_connection_pool(min_conn=1, max_conn=10):
         print(f"[ERROR] Failed to initialize database pool: {e}")
         print("  Using fallback JSON file storage")
         _connection_pool = None
+        return
+
+    for dsn in REPLICA_DSNS:
+        try:
+            _replica_pools.append(ConnectionPool(
+                min_conn,
+                REPLICA_POOL_MAX_CONN,
+                dsn=dsn,
+                connection_factory=PooledConnection
+            ))
+        except psycopg2.OperationalError as e:
+            print(f"[WARN] Skipping read replica: {e}")
+
+    if _replica_pools:
+        print(f"[OK] Read replica pools initialized ({len(_replica_pools)} replicas)")
 
 
 def close_connection_pool():
     """Close all connections in the pool"""
     global _connection_pool
 
+    for pool in _replica_pools:
+        pool.closeall()
+    _replica_pools.clear()
+
     if _connection_pool is not None:
         _connection_pool.closeall()
         _connection_pool = None
         print("[OK] Database connection pool closed")
 
 
+def get_pool_stats() -> Optional[Dict[str, Any]]:
+    """Get connection pool statistics (None if the pool is not initialized)"""
+    if _connection_pool is None:
+        return None
+    stats = _connection_pool.stats()
+    if _replica_pools:
+        stats['replicas'] = [pool.stats() for pool in _replica_pools]
+    return stats
+
+
+# =============================================================================
+# READ ROUTING
+# =============================================================================
+
+def mark_write():
+    """Pin reads in the current context to the primary for READ_YOUR_WRITES_WINDOW"""
+    _primary_until.set(time.time() + READ_YOUR_WRITES_WINDOW)
+
+
+def set_primary_until(timestamp: float = 0.0):
+    """
+    Reset read routing for a new request (timestamp carried over from the client).
+
+    The timestamp comes from a client cookie, so it is clamped to at most
+    READ_YOUR_WRITES_WINDOW from now: a forged far-future (or NaN) value
+    cannot pin the client's reads to the primary for longer than a write would.
+    """
+    if not math.isfinite(timestamp):
+        timestamp = 0.0
+    _primary_until.set(min(timestamp, time.time() + READ_YOUR_WRITES_WINDOW))
+
+
+def get_primary_until() -> float:
+    """Wall-clock time until which reads in this context go to the primary"""
+    return _primary_until.get()
+
+
+def add_write_listener(callback: Callable[[str], None]):
+    """Register callback(table_name), called after writes made through this module commit"""
+    _write_listeners.append(callback)
+
+
+def _notify_write(table: str):
+    for callback in _write_listeners:
+        try:
+            callback(table)
+        except Exception as e:
+            print(f"Write listener failed for {table}: {e}")
+
+
+def _checkout(read_only: bool):
+    """Pick a pool and check out a connection; returns (pool, conn)"""
+    if read_only and _replica_pools and time.time() >= _primary_until.get():
+        replica = _replica_pools[next(_replica_counter) % len(_replica_pools)]
+        try:
+            return replica, replica.getconn()
+        except (psycopg2.Error, PoolTimeoutError) as e:
+            # Replica down or saturated: the primary can still serve the read
+            print(f"[WARN] Read replica unavailable, using primary: {e}")
+
+    return _connection_pool, _connection_pool.getconn()
+
+
 @contextmanager
-def get_db_connection():
+def get_db_connection(read_only: bool = False):
     """
     Context manager for database connections.
     Automatically returns connection to pool when done.
 
+    Args:
+        read_only: Allow routing to a read replica (default: False = primary)
+
     Usage:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
@@ -83,69 +446,331 @@ def get_db_connection():
     if _connection_pool is None:
         raise Exception("Database connection pool not available")
 
-    conn = _connection_pool.getconn()
+    pool, conn = _checkout(read_only)
     try:
         yield conn
     except Exception as e:
         conn.rollback()
         raise e
     finally:
-        _connection_pool.putconn(conn)
+        pool.putconn(conn)
 
 
 @contextmanager
-def get_db_cursor(commit=True):
+def get_db_cursor(commit=True, primary=False):
     """
     Context manager for database cursor with auto-commit.
 
+    Read-only cursors (commit=False) are served by a read replica when
+    replicas are configured, unless this request wrote recently.
+
     Args:
         commit: Whether to commit transaction on success (default: True)
+        primary: Force a read-only cursor onto the primary
 
     Usage:
         with get_db_cursor() as cur:
             cur.execute("INSERT INTO properties (...) VALUES (...)")
     """
-    with get_db_connection() as conn:
+    with get_db_connection(read_only=not commit and not primary) as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             try:
                 yield cur
                 if commit:
                     conn.commit()
+                    mark_write()
             except Exception as e:
                 conn.rollback()
                 raise e
 
 
+def iter_query(sql: str, params: Sequence[Any] = (),
+               itersize: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream query results through a named (server-side) cursor.
+
+    Rows are pulled from PostgreSQL in batches of `itersize`, so memory stays
+    bounded no matter how many rows the query returns. The connection is held
+    until the generator is exhausted or closed.
+
+    Usage:
+        for row in iter_query("SELECT * FROM transactions"):
+            ...
+    """
+    with get_db_connection(read_only=True) as conn:
+        try:
+            cursor_name = f"stream_{uuid.uuid4().hex}"
+            with conn.cursor(name=cursor_name, cursor_factory=RealDictCursor) as cur:
+                cur.itersize = itersize or STREAM_ITERSIZE
+                cur.execute(sql, params)
+                for row in cur:
+                    yield dict(row)
+        finally:
+            # Named cursors live inside a transaction; end it before the
+            # connection goes back to the pool (also on early close).
+            if not conn.closed:
+                conn.rollback()
+
+
+# =============================================================================
+# PREPARED STATEMENTS
+# =============================================================================
+
+def execute_prepared(cur, name: str, sql: str, params: Sequence[Any] = ()):
+    """
+    Execute a hot query as a server-side prepared statement.
+
+    The statement is PREPAREd lazily the first time it runs on a connection
+    and then reused with EXECUTE, so PostgreSQL skips parsing and planning
+    on later calls. `sql` uses $1, $2, ... placeholders.
+
+    Falls back to a plain execute when prepared statements are disabled or
+    the connection does not track them (not from the pool).
+    """
+    conn = cur.connection
+    prepared = getattr(conn, 'prepared_statements', None)
+
+    if not USE_PREPARED_STATEMENTS or prepared is None:
+        plain_sql = sql
+        for index in range(len(params), 0, -1):
+            plain_sql = plain_sql.replace(f'${index}', '%s')
+        cur.execute(plain_sql, params)
+        return
+
+    if name not in prepared:
+        cur.execute(f"PREPARE {name} AS {sql}")
+        prepared.add(name)
+
+    try:
+        if params:
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
+    except psycopg2.errors.InvalidSqlStatementName:
+        # Session was reset underneath us (e.g. DISCARD ALL); re-prepare next time
+        prepared.clear()
+        raise
+
+
+# =============================================================================
+# COLUMN PROJECTION
+# =============================================================================
+#
+# Each entity declares a whitelist mapping API field names to SQL columns.
+# List endpoints accept ?fields=a,b,c and only those columns are selected;
+# anything outside the whitelist is rejected, so field names never reach
+# the SQL text unchecked.
+
+def select_list(field_map: Dict[str, str], fields: Optional[Sequence[str]] = None,
+                required: Sequence[str] = ()) -> str:
+    """
+    Build a SELECT column list from a field whitelist.
+
+    Args:
+        field_map: API field name -> SQL column expression
+        fields: Requested API field names (None = all fields)
+        required: Fields that must be selected anyway (e.g. keyset keys)
+
+    Raises:
+        ValueError: If a requested field is not in the whitelist
+    """
+    if fields:
+        unknown = [field for field in fields if field not in field_map]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        selected = list(dict.fromkeys([*fields, *required]))
+    else:
+        selected = list(field_map)
+
+    return ', '.join(
+        column if column == field else f'{column} as "{field}"'
+        for field, column in ((field, field_map[field]) for field in selected)
+    )
+
+
+def project_rows(rows: List[Dict[str, Any]],
+                 fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Drop helper columns (keyset keys etc.) that the caller did not ask for"""
+    if not fields:
+        return rows
+    keep = set(fields)
+    return [{key: value for key, value in row.items() if key in keep} for row in rows]
+
+
+# =============================================================================
+# KEYSET PAGINATION
+# =============================================================================
+#
+# List endpoints page with an opaque "after" cursor instead of OFFSET.
+# The cursor carries the sort key of the last row returned, so the next
+# page is a range scan on the matching (sort key, id) index and costs the
+# same no matter how deep the client has paged.
+
+# Stand-in for NULL timestamps in keyset sort keys, so rows without a
+# timestamp still have a comparable key (and sort last). It must be a value
+# that survives the round trip through the cursor: psycopg2 reads
+# '-infinity' back as datetime.min (0001-01-01), and a cursor holding that
+# would match every NULL row again and return the same page forever.
+KEYSET_NULL_TIMESTAMP = "'0001-01-01 00:00:00'::timestamp"
+
+
+def keyset_timestamp(column: str) -> str:
+    """NULL-free sort expression for a nullable timestamp keyset column"""
+    return f"COALESCE({column}, {KEYSET_NULL_TIMESTAMP})"
+
+
+def keyset_sort_columns(keyset: Sequence[Tuple[str, str]]) -> str:
+    """Extra SELECT columns for the helper sort keys (named sort*) of a keyset"""
+    return ', '.join(f'{expr} as "{key}"' for expr, key in keyset if key.startswith('sort'))
+
+
+def drop_sort_keys(rows: List[Dict[str, Any]], keyset: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Remove helper sort keys once the cursor has been built"""
+    sort_keys = [key for _, key in keyset if key.startswith('sort')]
+    for row in rows:
+        for key in sort_keys:
+            row.pop(key, None)
+    return rows
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode keyset values as an opaque, URL-safe cursor"""
+    raw = json.dumps(list(values), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor (raises ValueError if malformed)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
+
+    if not isinstance(values, list) or not all(
+            isinstance(value, (str, int, float)) for value in values):
+        raise ValueError(f"Invalid pagination cursor: {cursor}")
+    return values
+
+
+def fetch_keyset_page(cur, select_sql: str, keyset: Sequence[Tuple[str, str]],
+                      limit: Optional[int] = None, after: Optional[str] = None,
+                      where: Optional[str] = None,
+                      params: Sequence[Any] = ()) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Run a SELECT one keyset page at a time, newest first.
+
+    Args:
+        cur: Open cursor (from get_db_cursor)
+        select_sql: "SELECT ... FROM table" without WHERE/ORDER BY
+        keyset: (sql_expression, row_key) pairs in sort order, all DESC.
+                The last pair must be unique (normally the primary key).
+                Expressions must be NOT NULL - wrap nullable timestamps in
+                keyset_timestamp() and select them as sort* keys.
+        limit: Page size, clamped to 1..MAX_PAGE_SIZE
+        after: Cursor returned with the previous page
+        where: Optional extra filter ANDed with the keyset predicate
+        params: Parameters for the extra filter
+
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed or its values do not cast to
+                    the keyset column types
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    clauses = [where] if where else []
+    query_params = list(params)
+
+    if after:
+        values = decode_cursor(after)
+        if len(values) != len(keyset):
+            raise ValueError(f"Invalid pagination cursor: {after}")
+        columns = ', '.join(expr for expr, _ in keyset)
+        placeholders = ', '.join(['%s'] * len(keyset))
+        clauses.append(f"({columns}) < ({placeholders})")
+        query_params.extend(values)
+
+    sql = select_sql
+    if clauses:
+        sql += " WHERE " + " AND ".join(f"({clause})" for clause in clauses)
+    sql += " ORDER BY " + ", ".join(f"{expr} DESC" for expr, _ in keyset)
+    sql += " LIMIT %s"
+    # Fetch one extra row to know whether another page exists
+    query_params.append(limit + 1)
+
+    try:
+        cur.execute(sql, query_params)
+    except psycopg2.DataError as e:
+        # Cursor values that do not cast to the keyset column types
+        if after:
+            raise ValueError(f"Invalid pagination cursor: {after}") from e
+        raise
+    rows = [dict(row) for row in cur.fetchall()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][key] for _, key in keyset])
+
+    return rows, next_cursor
+
+
 # =============================================================================
 # PROPERTIES QUERIES
 # =============================================================================
 
-def get_all_properties() -> List[Dict[str, Any]]:
-    """Get all properties"""
+PROPERTY_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'address': 'address',
+    'type': 'type',
+    'units': 'units',
+    'occupied': 'occupied',
+    'monthlyRevenue': 'monthly_revenue',
+    'purchasePrice': 'purchase_price',
+    'purchaseDate': 'purchase_date',
+    'status': 'status',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+PROPERTY_COLUMNS = select_list(PROPERTY_FIELDS)
+
+# Served by idx_properties_keyset (created_at may be NULL)
+PROPERTY_KEYSET = [(keyset_timestamp('created_at'), 'sortCreatedAt'), ('id', 'id')]
+
+
+def get_all_properties(fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Get all properties (optionally only the given fields)"""
     with get_db_cursor(commit=False) as cur:
-        cur.execute("""
-            SELECT id, name, address, type, units, occupied,
-                   monthly_revenue as "monthlyRevenue",
-                   purchase_price as "purchasePrice",
-                   purchase_date as "purchaseDate",
-                   status, created_at, updated_at
+        cur.execute(f"""
+            SELECT {select_list(PROPERTY_FIELDS, fields)}
             FROM properties
             ORDER BY created_at DESC
         """)
         return [dict(row) for row in cur.fetchall()]
 
 
+def get_properties_page(limit: Optional[int] = None, after: Optional[str] = None,
+                        fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of properties, newest first"""
+    columns = select_list(PROPERTY_FIELDS, fields, required=['id'])
+    with get_db_cursor(commit=False) as cur:
+        rows, next_cursor = fetch_keyset_page(
+            cur, f"SELECT {columns}, {keyset_sort_columns(PROPERTY_KEYSET)} FROM properties",
+            PROPERTY_KEYSET, limit, after
+        )
+    return project_rows(drop_sort_keys(rows, PROPERTY_KEYSET), fields), next_cursor
+
+
 def get_property_by_id(property_id: int) -> Optional[Dict[str, Any]]:
     """Get property by ID"""
     with get_db_cursor(commit=False) as cur:
-        cur.execute("""
-            SELECT id, name, address, type, units, occupied,
-                   monthly_revenue as "monthlyRevenue",
-                   purchase_price as "purchasePrice",
-                   purchase_date as "purchaseDate",
-                   status, created_at, updated_at
+        execute_prepared(cur, 'property_by_id', f"""
+            SELECT {PROPERTY_COLUMNS}
             FROM properties
-            WHERE id = %s
+            WHERE id = $1
         """, (property_id,))
         row = cur.fetchone()
         return dict(row) if row else None
@@ -163,7 +788,9 @@ def create_property(property_data: Dict[str, Any]) -> int:
              %(monthlyRevenue)s, %(purchasePrice)s, %(purchaseDate)s, %(status)s)
             RETURNING id
         """, property_data)
-        return cur.fetchone()['id']
+        property_id = cur.fetchone()['id']
+    _notify_write('properties')
+    return property_id
 
 
 def update_property(property_id: int, property_data: Dict[str, Any]) -> bool:
@@ -183,46 +810,77 @@ def update_property(property_id: int, property_data: Dict[str, Any]) -> bool:
                 updated_at = CURRENT_TIMESTAMP
             WHERE id = %(id)s
         """, {**property_data, 'id': property_id})
-        return cur.rowcount > 0
+        updated = cur.rowcount > 0
+    _notify_write('properties')
+    return updated
 
 
 def delete_property(property_id: int) -> bool:
     """Delete property"""
     with get_db_cursor() as cur:
         cur.execute("DELETE FROM properties WHERE id = %s", (property_id,))
-        return cur.rowcount > 0
+        deleted = cur.rowcount > 0
+    _notify_write('properties')
+    return deleted
 
 
 # =============================================================================
 # TENANTS QUERIES
 # =============================================================================
 
-def get_all_tenants() -> List[Dict[str, Any]]:
-    """Get all tenants"""
+TENANT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'email': 'email',
+    'phone': 'phone',
+    'propertyId': 'property_id',
+    'property': 'property_name',
+    'unit': 'unit',
+    'rent': 'rent',
+    'leaseStart': 'lease_start',
+    'leaseEnd': 'lease_end',
+    'status': 'status',
+    'balance': 'balance',
+    'avatar': 'avatar',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+TENANT_COLUMNS = select_list(TENANT_FIELDS)
+
+# Served by idx_tenants_keyset (created_at may be NULL, e.g. migrated rows)
+TENANT_KEYSET = [(keyset_timestamp('created_at'), 'sortCreatedAt'), ('id', 'id')]
+
+
+def get_all_tenants(fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Get all tenants (optionally only the given fields)"""
     with get_db_cursor(commit=False) as cur:
-        cur.execute("""
-            SELECT id, name, email, phone, property_id as "propertyId",
-                   property_name as property, unit, rent,
-                   lease_start as "leaseStart",
-                   lease_end as "leaseEnd",
-                   status, balance, avatar, created_at, updated_at
+        cur.execute(f"""
+            SELECT {select_list(TENANT_FIELDS, fields)}
             FROM tenants
             ORDER BY created_at DESC
         """)
         return [dict(row) for row in cur.fetchall()]
 
 
+def get_tenants_page(limit: Optional[int] = None, after: Optional[str] = None,
+                     fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of tenants, newest first"""
+    columns = select_list(TENANT_FIELDS, fields, required=['id'])
+    with get_db_cursor(commit=False) as cur:
+        rows, next_cursor = fetch_keyset_page(
+            cur, f"SELECT {columns}, {keyset_sort_columns(TENANT_KEYSET)} FROM tenants",
+            TENANT_KEYSET, limit, after
+        )
+    return project_rows(drop_sort_keys(rows, TENANT_KEYSET), fields), next_cursor
+
+
 def get_tenant_by_email(email: str) -> Optional[Dict[str, Any]]:
     """Get tenant by email (for Tenant Portal login)"""
     with get_db_cursor(commit=False) as cur:
-        cur.execute("""
-            SELECT id, name, email, phone, property_id as "propertyId",
-                   property_name as property, unit, rent,
-                   lease_start as "leaseStart",
-                   lease_end as "leaseEnd",
-                   status, balance, avatar, created_at, updated_at
+        execute_prepared(cur, 'tenant_by_email', f"""
+            SELECT {TENANT_COLUMNS}
             FROM tenants
-            WHERE email = %s
+            WHERE email = $1
         """, (email,))
         row = cur.fetchone()
         return dict(row) if row else None
@@ -272,31 +930,54 @@ def update_tenant(tenant_id: int, tenant_data: Dict[str, Any]) -> bool:
 # MESSAGES QUERIES
 # =============================================================================
 
-def get_all_messages(tenant_email: Optional[str] = None) -> List[Dict[str, Any]]:
+MESSAGE_FIELDS = {
+    'id': 'id',
+    'from': 'from_name',
+    'fromEmail': 'from_email',
+    'to': 'to_name',
+    'toEmail': 'to_email',
+    'property': 'property',
+    'unit': 'unit',
+    'subject': 'subject',
+    'message': 'message',
+    'date': 'date',
+    'time': 'time',
+    'read': 'read',
+    'type': 'type',
+    'status': 'status',
+    'maintenanceData': 'maintenance_data',
+    'workOrderId': 'work_order_id',
+    'replyTo': 'reply_to',
+    'submittedAt': 'submitted_at',
+    'approvedAt': 'approved_at',
+    'sentAt': 'sent_at',
+}
+MESSAGE_COLUMNS = select_list(MESSAGE_FIELDS)
+
+# Same order as "submitted_at DESC NULLS LAST, created_at DESC" but NULL-free,
+# so it can be compared row-wise. Served by idx_messages_keyset.
+MESSAGE_KEYSET = [
+    (keyset_timestamp('submitted_at'), 'sortSubmittedAt'),
+    (keyset_timestamp('created_at'), 'sortCreatedAt'),
+    ('id', 'id'),
+]
+
+
+def get_all_messages(tenant_email: Optional[str] = None,
+                     fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
     """Get all messages, optionally filtered by tenant email"""
+    columns = select_list(MESSAGE_FIELDS, fields)
     with get_db_cursor(commit=False) as cur:
         if tenant_email:
-            cur.execute("""
-                SELECT id, from_name as "from", from_email as "fromEmail",
-                       to_name as "to", to_email as "toEmail",
-                       property, unit, subject, message, date, time, read,
-                       type, status, maintenance_data as "maintenanceData",
-                       work_order_id as "workOrderId", reply_to as "replyTo",
-                       submitted_at as "submittedAt", approved_at as "approvedAt",
-                       sent_at as "sentAt"
+            cur.execute(f"""
+                SELECT {columns}
                 FROM messages
                 WHERE from_email = %s OR to_email = %s
                 ORDER BY submitted_at DESC NULLS LAST, created_at DESC
             """, (tenant_email, tenant_email))
         else:
-            cur.execute("""
-                SELECT id, from_name as "from", from_email as "fromEmail",
-                       to_name as "to", to_email as "toEmail",
-                       property, unit, subject, message, date, time, read,
-                       type, status, maintenance_data as "maintenanceData",
-                       work_order_id as "workOrderId", reply_to as "replyTo",
-                       submitted_at as "submittedAt", approved_at as "approvedAt",
-                       sent_at as "sentAt"
+            cur.execute(f"""
+                SELECT {columns}
                 FROM messages
                 ORDER BY submitted_at DESC NULLS LAST, created_at DESC
             """)
@@ -304,45 +985,215 @@ def get_all_messages(tenant_email: Optional[str] = None) -> List[Dict[str, Any]]
         return [dict(row) for row in cur.fetchall()]
 
 
+def get_messages_page(tenant_email: Optional[str] = None, limit: Optional[int] = None,
+                      after: Optional[str] = None,
+                      fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of messages, optionally filtered by tenant email"""
+    columns = select_list(MESSAGE_FIELDS, fields, required=['id'])
+    select_sql = f"SELECT {columns}, {keyset_sort_columns(MESSAGE_KEYSET)} FROM messages"
+
+    with get_db_cursor(commit=False) as cur:
+        if tenant_email:
+            rows, next_cursor = fetch_keyset_page(
+                cur, select_sql, MESSAGE_KEYSET, limit, after,
+                where="from_email = %s OR to_email = %s",
+                params=(tenant_email, tenant_email)
+            )
+        else:
+            rows, next_cursor = fetch_keyset_page(cur, select_sql, MESSAGE_KEYSET, limit, after)
+
+    # Sort keys are only needed to build the cursor
+    return project_rows(drop_sort_keys(rows, MESSAGE_KEYSET), fields), next_cursor
+
+
+# Inbox rows come from message_participants p JOIN messages m; "read" is the
+# participant's own flag (a sender's copy is always read)
+INBOX_FIELDS = {**{key: f"m.{column}" for key, column in MESSAGE_FIELDS.items()}, 'read': 'p.read'}
+
+# Served by idx_message_participants_inbox / idx_message_participants_unread
+INBOX_KEYSET = [('p.submitted_at', 'sortSubmittedAt'), ('p.message_id', 'id')]
+
+
+def get_inbox_page(email: str, unread_only: bool = False, limit: Optional[int] = None,
+                   after: Optional[str] = None,
+                   fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of a mailbox (messages sent or received by email), newest first"""
+    columns = select_list(INBOX_FIELDS, fields, required=['id'])
+    select_sql = f"""
+        SELECT {columns}, p.submitted_at as "sortSubmittedAt"
+        FROM message_participants p
+        JOIN messages m ON m.id = p.message_id
+    """
+    where = "p.email = %s AND p.read = FALSE" if unread_only else "p.email = %s"
+
+    with get_db_cursor(commit=False) as cur:
+        rows, next_cursor = fetch_keyset_page(
+            cur, select_sql, INBOX_KEYSET, limit, after, where=where, params=(email,)
+        )
+
+    for row in rows:
+        row.pop('sortSubmittedAt', None)
+    return project_rows(rows, fields), next_cursor
+
+
+def get_mailbox_counts(email: str) -> Dict[str, int]:
+    """Total and unread message counts for a mailbox (maintained by triggers)"""
+    with get_db_cursor(commit=False) as cur:
+        execute_prepared(cur, 'mailbox_counts', """
+            SELECT total_count, unread_count
+            FROM mailboxes
+            WHERE email = $1
+        """, (email,))
+        row = cur.fetchone()
+
+    return {
+        'total': row['total_count'] if row else 0,
+        'unread': row['unread_count'] if row else 0,
+    }
+
+
+def stream_messages(tenant_email: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream all messages (for bulk export), optionally filtered by tenant email"""
+    if tenant_email:
+        return iter_query(f"""
+            SELECT {MESSAGE_COLUMNS}
+            FROM messages
+            WHERE from_email = %s OR to_email = %s
+            ORDER BY submitted_at DESC NULLS LAST, created_at DESC
+        """, (tenant_email, tenant_email))
+
+    return iter_query(f"""
+        SELECT {MESSAGE_COLUMNS}
+        FROM messages
+        ORDER BY submitted_at DESC NULLS LAST, created_at DESC
+    """)
+
+
+# Deepest reply level returned by get_message_thread (also bounds the walk
+# up to the root, so a corrupt reply_to cycle cannot recurse forever)
+THREAD_MAX_DEPTH = int(os.getenv('DB_THREAD_MAX_DEPTH', 50))
+
+THREAD_FIELDS = {key: f"m.{column}" for key, column in MESSAGE_FIELDS.items()}
+
+
+def get_message_thread(message_id: int, max_depth: Optional[int] = None,
+                       fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get the whole conversation a message belongs to in one query.
+
+    Walks reply_to up from message_id to the root, then down through all
+    replies (idx_messages_reply_to). Messages come back depth-first, replies
+    in id (= send time) order, each with its depth below the root.
+
+    Args:
+        message_id: Any message of the thread
+        max_depth: Reply levels to return below the root (0 = root only,
+            None = THREAD_MAX_DEPTH; larger values are capped at it)
+        fields: Message fields to return (id, replyTo and depth always are)
+
+    Returns:
+        {'rootId', 'messages', 'truncated'} or None if the message does not
+        exist. truncated is True when replies deeper than max_depth exist.
+
+    Raises:
+        ValueError: Negative max_depth
+    """
+    if max_depth is None:
+        max_depth = THREAD_MAX_DEPTH
+    if max_depth < 0:
+        raise ValueError("maxDepth must not be negative")
+    max_depth = min(max_depth, THREAD_MAX_DEPTH)
+    columns = select_list(THREAD_FIELDS, fields, required=['id', 'replyTo'])
+
+    with get_db_cursor(commit=False) as cur:
+        cur.execute(f"""
+            WITH RECURSIVE ancestors AS (
+                SELECT id, reply_to, 0 AS depth
+                FROM messages
+                WHERE id = %(id)s
+                UNION ALL
+                SELECT m.id, m.reply_to, a.depth + 1
+                FROM messages m
+                JOIN ancestors a ON m.id = a.reply_to
+                WHERE a.depth < %(max_walk)s
+            ),
+            root AS (
+                SELECT id FROM ancestors ORDER BY depth DESC LIMIT 1
+            ),
+            thread AS (
+                SELECT id, 0 AS depth, ARRAY[id] AS path
+                FROM root
+                UNION ALL
+                SELECT m.id, t.depth + 1, t.path || m.id
+                FROM messages m
+                JOIN thread t ON m.reply_to = t.id
+                WHERE t.depth < %(max_depth)s
+                  AND m.id <> ALL(t.path)
+            )
+            SELECT {columns}, t.depth,
+                   t.depth = %(max_depth)s
+                       AND EXISTS (SELECT 1 FROM messages c WHERE c.reply_to = t.id) AS "hasMoreReplies"
+            FROM thread t
+            JOIN messages m ON m.id = t.id
+            ORDER BY t.path
+        """, {'id': message_id, 'max_depth': max_depth, 'max_walk': THREAD_MAX_DEPTH})
+        rows = [dict(row) for row in cur.fetchall()]
+
+    if not rows:
+        return None
+
+    truncated = any(row.pop('hasMoreReplies') for row in rows)
+    messages = project_rows(rows, [*fields, 'id', 'replyTo', 'depth']) if fields else rows
+    return {
+        'rootId': rows[0]['id'],
+        'messages': messages,
+        'truncated': truncated,
+    }
+
+
+def _insert_message(cur, message_data: Dict[str, Any]) -> int:
+    # Convert maintenance_data to JSONB if present
+    maintenance_data = message_data.get('maintenanceData')
+    if maintenance_data:
+        maintenance_data = Json(maintenance_data)
+
+    cur.execute("""
+        INSERT INTO messages
+        (id, from_name, from_email, to_name, to_email, property, unit,
+         subject, message, date, time, read, type, status, maintenance_data,
+         work_order_id, reply_to, submitted_at, approved_at, sent_at)
+        VALUES
+        (%(id)s, %(from)s, %(fromEmail)s, %(to)s, %(toEmail)s, %(property)s,
+         %(unit)s, %(subject)s, %(message)s, %(date)s, %(time)s, %(read)s,
+         %(type)s, %(status)s, %(maintenanceData)s, %(workOrderId)s, %(replyTo)s,
+         %(submittedAt)s, %(approvedAt)s, %(sentAt)s)
+        RETURNING id
+    """, {
+        **message_data,
+        'maintenanceData': maintenance_data,
+        'read': message_data.get('read', False),
+        'to': message_data.get('to'),
+        'toEmail': message_data.get('toEmail'),
+        'property': message_data.get('property'),
+        'unit': message_data.get('unit'),
+        'status': message_data.get('status'),
+        'workOrderId': message_data.get('workOrderId'),
+        'replyTo': message_data.get('replyTo'),
+        'submittedAt': message_data.get('submittedAt'),
+        'approvedAt': message_data.get('approvedAt'),
+        'sentAt': message_data.get('sentAt')
+    })
+    return cur.fetchone()['id']
+
+
 def create_message(message_data: Dict[str, Any]) -> int:
-    """Create new message and return ID"""
+    """Create new message and return ID (mailbox rows/counters follow via trigger)"""
     with get_db_cursor() as cur:
-        # Convert maintenance_data to JSONB if present
-        maintenance_data = message_data.get('maintenanceData')
-        if maintenance_data:
-            maintenance_data = Json(maintenance_data)
-
-        cur.execute("""
-            INSERT INTO messages
-            (id, from_name, from_email, to_name, to_email, property, unit,
-             subject, message, date, time, read, type, status, maintenance_data,
-             work_order_id, reply_to, submitted_at, approved_at, sent_at)
-            VALUES
-            (%(id)s, %(from)s, %(fromEmail)s, %(to)s, %(toEmail)s, %(property)s,
-             %(unit)s, %(subject)s, %(message)s, %(date)s, %(time)s, %(read)s,
-             %(type)s, %(status)s, %(maintenanceData)s, %(workOrderId)s, %(replyTo)s,
-             %(submittedAt)s, %(approvedAt)s, %(sentAt)s)
-            RETURNING id
-        """, {
-            **message_data,
-            'maintenanceData': maintenance_data,
-            'read': message_data.get('read', False),
-            'to': message_data.get('to'),
-            'toEmail': message_data.get('toEmail'),
-            'property': message_data.get('property'),
-            'unit': message_data.get('unit'),
-            'status': message_data.get('status'),
-            'workOrderId': message_data.get('workOrderId'),
-            'replyTo': message_data.get('replyTo'),
-            'submittedAt': message_data.get('submittedAt'),
-            'approvedAt': message_data.get('approvedAt'),
-            'sentAt': message_data.get('sentAt')
-        })
-        return cur.fetchone()['id']
+        return _insert_message(cur, message_data)
 
 
 def mark_message_as_read(message_id: int) -> bool:
-    """Mark message as read"""
+    """Mark message as read (the recipient's unread counter follows via trigger)"""
     with get_db_cursor() as cur:
         cur.execute("""
             UPDATE messages
@@ -352,78 +1203,214 @@ def mark_message_as_read(message_id: int) -> bool:
         return cur.rowcount > 0
 
 
+def get_tenant_maintenance_requests(tenant_name: Optional[str] = None, unit: Optional[str] = None,
+                                    tenant_email: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Get maintenance request messages with their linked work order status.
+
+    Filters by tenant name, else unit, else sender email (all requests when
+    none is given). One query: messages LEFT JOIN work_orders on its primary
+    key. The unit filter (tenant portal) is served by
+    idx_messages_maintenance_unit, the email filter by idx_messages_from_email.
+    The tenant name filter is left unindexed: no client sends it, and an index
+    would add write cost to every message insert.
+    """
+    if tenant_name:
+        where, params = "AND m.from_name = %s", (tenant_name,)
+    elif unit:
+        where, params = "AND m.unit = %s", (unit,)
+    elif tenant_email:
+        where, params = "AND m.from_email = %s", (tenant_email,)
+    else:
+        where, params = "", ()
+
+    with get_db_cursor(commit=False) as cur:
+        cur.execute(f"""
+            SELECT
+                m.id,
+                COALESCE(m.maintenance_data->>'title', 'Maintenance Request') AS title,
+                m.message AS description,
+                m.maintenance_data->>'category' AS category,
+                m.maintenance_data->>'priority' AS priority,
+                m.status,
+                m.submitted_at AS "submittedAt",
+                m.approved_at AS "approvedAt",
+                m.work_order_id AS "workOrderId",
+                m.maintenance_data->>'location' AS location,
+                COALESCE(m.maintenance_data->'photos', '[]'::jsonb) AS photos,
+                w.id AS "linkedWorkOrderId",
+                w.status AS "workOrderStatus",
+                w.date AS "workOrderDate"
+            FROM messages m
+            LEFT JOIN work_orders w ON w.id = m.work_order_id
+            WHERE m.type = 'maintenance_request'
+              {where}
+            ORDER BY m.submitted_at DESC NULLS LAST, m.created_at DESC
+        """, params)
+
+        results = []
+        for row in cur.fetchall():
+            item = dict(row)
+            # Work order details only when the linked work order exists
+            if item.pop('linkedWorkOrderId') is None:
+                del item['workOrderStatus']
+                del item['workOrderDate']
+            results.append(item)
+        return results
+
+
+def _set_message_status(cur, message_id: int, status: str, work_order_id: Optional[int]) -> bool:
+    cur.execute("""
+        UPDATE messages
+        SET status = %s,
+            work_order_id = %s,
+            approved_at = CASE WHEN %s = 'approved' THEN CURRENT_TIMESTAMP ELSE approved_at END
+        WHERE id = %s
+    """, (status, work_order_id, status, message_id))
+    return cur.rowcount > 0
+
+
 def update_message_status(message_id: int, status: str, work_order_id: Optional[int] = None) -> bool:
     """Update message status and work order ID"""
     with get_db_cursor() as cur:
-        cur.execute("""
-            UPDATE messages
-            SET status = %s,
-                work_order_id = %s,
-                approved_at = CASE WHEN %s = 'approved' THEN CURRENT_TIMESTAMP ELSE approved_at END
-            WHERE id = %s
-        """, (status, work_order_id, status, message_id))
-        return cur.rowcount > 0
+        return _set_message_status(cur, message_id, status, work_order_id)
+
+
+def approve_maintenance_request(
+        message_id: int,
+        build_work_order: Callable[[Dict[str, Any]], Dict[str, Any]],
+        build_notification: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Convert a maintenance request message into a work order in one transaction.
+
+    The message row is locked (SELECT ... FOR UPDATE) while the work order is
+    created, the message is marked approved and the tenant notification is
+    inserted, so concurrent approvals of the same request cannot both succeed.
+
+    Args:
+        message_id: Maintenance request message ID
+        build_work_order: Called with the locked message, returns work order data
+        build_notification: Called with the message and work order, returns
+            the notification message data
+
+    Returns:
+        (work_order, notification), or None if no such maintenance request
+
+    Raises:
+        ValueError: Request already approved
+    """
+    with get_db_cursor() as cur:
+        cur.execute(f"""
+            SELECT {MESSAGE_COLUMNS}
+            FROM messages
+            WHERE id = %s AND type = 'maintenance_request'
+            FOR UPDATE
+        """, (message_id,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+
+        message = dict(row)
+        if message.get('status') == 'approved':
+            raise ValueError('Request already approved')
+
+        work_order = build_work_order(message)
+        work_order['id'] = _insert_work_order(cur, work_order)
+        _set_message_status(cur, message_id, 'approved', work_order['id'])
+
+        notification = build_notification(message, work_order)
+        notification['id'] = _insert_message(cur, notification)
+
+    return work_order, notification
 
 
 # =============================================================================
 # WORK ORDERS QUERIES
 # =============================================================================
 
-def get_all_work_orders() -> List[Dict[str, Any]]:
-    """Get all work orders"""
+WORK_ORDER_FIELDS = {
+    'id': 'id',
+    'property': 'property',
+    'tenant': 'tenant',
+    'unit': 'unit',
+    'issue': 'issue',
+    'description': 'description',
+    'category': 'category',
+    'priority': 'priority',
+    'status': 'status',
+    'date': 'date',
+    'location': 'location',
+    'accessInstructions': 'access_instructions',
+    'preferredTime': 'preferred_time',
+    'photos': 'photos',
+    'source': 'source',
+    'messageId': 'message_id',
+    'submittedAt': 'submitted_at',
+    'approvedAt': 'approved_at',
+    'updatedAt': 'updated_at',
+}
+WORK_ORDER_COLUMNS = select_list(WORK_ORDER_FIELDS)
+
+# Served by idx_work_orders_keyset (date DESC, id DESC)
+WORK_ORDER_KEYSET = [('date', 'date'), ('id', 'id')]
+
+
+def get_all_work_orders(fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Get all work orders (optionally only the given fields)"""
     with get_db_cursor(commit=False) as cur:
-        cur.execute("""
-            SELECT id, property, tenant, unit, issue, description, category,
-                   priority, status, date, location,
-                   access_instructions as "accessInstructions",
-                   preferred_time as "preferredTime",
-                   photos, source,
-                   message_id as "messageId",
-                   submitted_at as "submittedAt",
-                   approved_at as "approvedAt",
-                   updated_at as "updatedAt"
+        cur.execute(f"""
+            SELECT {select_list(WORK_ORDER_FIELDS, fields)}
             FROM work_orders
             ORDER BY date DESC
         """)
         return [dict(row) for row in cur.fetchall()]
 
 
+def get_work_orders_page(limit: Optional[int] = None, after: Optional[str] = None,
+                         fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of work orders, most recent first"""
+    columns = select_list(WORK_ORDER_FIELDS, fields, required=[key for _, key in WORK_ORDER_KEYSET])
+    with get_db_cursor(commit=False) as cur:
+        rows, next_cursor = fetch_keyset_page(
+            cur, f"SELECT {columns} FROM work_orders",
+            WORK_ORDER_KEYSET, limit, after
+        )
+    return project_rows(rows, fields), next_cursor
+
+
 def get_work_order_by_id(work_order_id: int) -> Optional[Dict[str, Any]]:
     """Get work order by ID"""
     with get_db_cursor(commit=False) as cur:
-        cur.execute("""
-            SELECT id, property, tenant, unit, issue, description, category,
-                   priority, status, date, location,
-                   access_instructions as "accessInstructions",
-                   preferred_time as "preferredTime",
-                   photos, source,
-                   message_id as "messageId",
-                   submitted_at as "submittedAt",
-                   approved_at as "approvedAt",
-                   updated_at as "updatedAt"
+        execute_prepared(cur, 'work_order_by_id', f"""
+            SELECT {WORK_ORDER_COLUMNS}
             FROM work_orders
-            WHERE id = %s
+            WHERE id = $1
         """, (work_order_id,))
         row = cur.fetchone()
         return dict(row) if row else None
 
 
+def _insert_work_order(cur, work_order_data: Dict[str, Any]) -> int:
+    cur.execute("""
+        INSERT INTO work_orders
+        (id, property, tenant, unit, issue, description, category, priority,
+         status, date, location, access_instructions, preferred_time, photos,
+         source, message_id, submitted_at, approved_at)
+        VALUES
+        (%(id)s, %(property)s, %(tenant)s, %(unit)s, %(issue)s, %(description)s,
+         %(category)s, %(priority)s, %(status)s, %(date)s, %(location)s,
+         %(accessInstructions)s, %(preferredTime)s, %(photos)s, %(source)s,
+         %(messageId)s, %(submittedAt)s, %(approvedAt)s)
+        RETURNING id
+    """, work_order_data)
+    return cur.fetchone()['id']
+
+
 def create_work_order(work_order_data: Dict[str, Any]) -> int:
     """Create new work order and return ID"""
     with get_db_cursor() as cur:
-        cur.execute("""
-            INSERT INTO work_orders
-            (id, property, tenant, unit, issue, description, category, priority,
-             status, date, location, access_instructions, preferred_time, photos,
-             source, message_id, submitted_at, approved_at)
-            VALUES
-            (%(id)s, %(property)s, %(tenant)s, %(unit)s, %(issue)s, %(description)s,
-             %(category)s, %(priority)s, %(status)s, %(date)s, %(location)s,
-             %(accessInstructions)s, %(preferredTime)s, %(photos)s, %(source)s,
-             %(messageId)s, %(submittedAt)s, %(approvedAt)s)
-            RETURNING id
-        """, work_order_data)
-        return cur.fetchone()['id']
+        return _insert_work_order(cur, work_order_data)
 
 
 def update_work_order_status(work_order_id: int, status: str) -> bool:
@@ -438,66 +1425,177 @@ def update_work_order_status(work_order_id: int, status: str) -> bool:
         return cur.rowcount > 0
 
 
+# =============================================================================
+# TRANSACTIONS QUERIES
+# =============================================================================
+
+# transactions stores only the property/tenant ids; the names the Financial
+# view shows are primary-key lookups (no join, so keyset columns stay unqualified)
+TRANSACTION_FIELDS = {
+    'id': 'id',
+    'propertyId': 'property_id',
+    'property': '(SELECT p.name FROM properties p WHERE p.id = transactions.property_id)',
+    'tenantId': 'tenant_id',
+    'tenant': '(SELECT t.name FROM tenants t WHERE t.id = transactions.tenant_id)',
+    'amount': 'amount',
+    'type': 'type',
+    'category': 'category',
+    'date': 'date',
+    'description': 'description',
+    'paymentMethod': 'payment_method',
+    'created_at': 'created_at',
+}
+TRANSACTION_COLUMNS = select_list(TRANSACTION_FIELDS)
+
+# Served by idx_transactions_keyset (created_at may be NULL)
+TRANSACTION_KEYSET = [('date', 'date'), (keyset_timestamp('created_at'), 'sortCreatedAt'), ('id', 'id')]
+
+
+def get_all_transactions(fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Get all transactions (optionally only the given fields)"""
+    with get_db_cursor(commit=False) as cur:
+        cur.execute(f"""
+            SELECT {select_list(TRANSACTION_FIELDS, fields)}
+            FROM transactions
+            ORDER BY date DESC, created_at DESC
+        """)
+        return [dict(row) for row in cur.fetchall()]
+
+
+def get_transactions_page(limit: Optional[int] = None, after: Optional[str] = None,
+                          fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of transactions, most recent first"""
+    columns = select_list(TRANSACTION_FIELDS, fields, required=['date', 'id'])
+    with get_db_cursor(commit=False) as cur:
+        rows, next_cursor = fetch_keyset_page(
+            cur, f"SELECT {columns}, {keyset_sort_columns(TRANSACTION_KEYSET)} FROM transactions",
+            TRANSACTION_KEYSET, limit, after
+        )
+    return project_rows(drop_sort_keys(rows, TRANSACTION_KEYSET), fields), next_cursor
+
+
+def stream_transactions() -> Iterator[Dict[str, Any]]:
+    """Stream all transactions (for bulk export)"""
+    return iter_query(f"""
+        SELECT {TRANSACTION_COLUMNS}
+        FROM transactions
+        ORDER BY date DESC, created_at DESC
+    """)
+
+
 # =============================================================================
 # APPLICATIONS QUERIES
 # =============================================================================
 
-def get_all_applications() -> List[Dict[str, Any]]:
-    """Get all applications"""
+APPLICATION_FIELDS = {
+    'id': 'id',
+    'status': 'status',
+    'submittedDate': 'submitted_date',
+    'firstName': 'first_name',
+    'lastName': 'last_name',
+    'email': 'email',
+    'phone': 'phone',
+    'dateOfBirth': 'date_of_birth',
+    'ssn': 'ssn',
+    'propertyId': 'property_id',
+    'propertyName': 'property_name',
+    'desiredUnit': 'desired_unit',
+    'desiredMoveInDate': 'desired_move_in_date',
+    'leaseTerm': 'lease_term',
+    'currentEmployer': 'current_employer',
+    'jobTitle': 'job_title',
+    'employmentStartDate': 'employment_start_date',
+    'monthlyIncome': 'monthly_income',
+    'employerPhone': 'employer_phone',
+    'additionalIncome': 'additional_income',
+    'currentAddress': 'current_address',
+    'previousAddresses': 'previous_addresses',
+    'emergencyContact': 'emergency_contact',
+    'personalReferences': 'personal_references',
+    'occupants': 'occupants',
+    'pets': 'pets',
+    'vehicles': 'vehicles',
+    'hasEvictions': 'has_evictions',
+    'hasBankruptcy': 'has_bankruptcy',
+    'hasCriminalHistory': 'has_criminal_history',
+    'disclosureNotes': 'disclosure_notes',
+    'backgroundCheckConsent': 'background_check_consent',
+    'creditCheckConsent': 'credit_check_consent',
+    'consentSignature': 'consent_signature',
+    'consentDate': 'consent_date',
+    'documents': 'documents',
+    'screeningId': 'screening_id',
+    'reviewedBy': 'reviewed_by',
+    'reviewedDate': 'reviewed_date',
+    'decisionReason': 'decision_reason',
+    'tenantId': 'tenant_id',
+    'createdAt': 'created_at',
+    'updatedAt': 'updated_at',
+    'lastUpdated': 'last_updated',
+}
+APPLICATION_COLUMNS = select_list(APPLICATION_FIELDS)
+
+# Columns matched by ?search= (covered by idx_applications_search_trgm)
+APPLICATION_SEARCH_COLUMNS = ['first_name', 'last_name', 'email', 'property_name']
+
+
+def _like_pattern(term: str) -> str:
+    """Build an ILIKE substring pattern, escaping LIKE wildcards in the term"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def get_all_applications(status: Optional[str] = None,
+                         property_id: Optional[str] = None,
+                         search: Optional[str] = None,
+                         fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Get all applications, optionally filtered.
+
+    Args:
+        status: Exact status match (uses idx_applications_status)
+        property_id: Exact property ID match (uses idx_applications_property_id)
+        search: Case-insensitive substring over name, email and property name
+                (uses the pg_trgm index idx_applications_search_trgm)
+        fields: Only select these fields (see APPLICATION_FIELDS)
+    """
+    clauses = []
+    params: List[Any] = []
+
+    if status:
+        clauses.append("status = %s")
+        params.append(status)
+
+    if property_id is not None:
+        clauses.append("property_id = %s")
+        params.append(property_id)
+
+    if search:
+        pattern = _like_pattern(search)
+        clauses.append("(" + " OR ".join(
+            f"{column} ILIKE %s" for column in APPLICATION_SEARCH_COLUMNS
+        ) + ")")
+        params.extend([pattern] * len(APPLICATION_SEARCH_COLUMNS))
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
     with get_db_cursor(commit=False) as cur:
-        cur.execute("""
-            SELECT id, status, submitted_date as "submittedDate",
-                   first_name as "firstName", last_name as "lastName",
-                   email, phone, date_of_birth as "dateOfBirth", ssn,
-                   property_id as "propertyId", property_name as "propertyName",
-                   desired_unit as "desiredUnit", desired_move_in_date as "desiredMoveInDate",
-                   lease_term as "leaseTerm", current_employer as "currentEmployer",
-                   job_title as "jobTitle", employment_start_date as "employmentStartDate",
-                   monthly_income as "monthlyIncome", employer_phone as "employerPhone",
-                   additional_income as "additionalIncome", current_address as "currentAddress",
-                   previous_addresses as "previousAddresses", emergency_contact as "emergencyContact",
-                   personal_references as "personalReferences", occupants, pets, vehicles,
-                   has_evictions as "hasEvictions", has_bankruptcy as "hasBankruptcy",
-                   has_criminal_history as "hasCriminalHistory", disclosure_notes as "disclosureNotes",
-                   background_check_consent as "backgroundCheckConsent",
-                   credit_check_consent as "creditCheckConsent",
-                   consent_signature as "consentSignature", consent_date as "consentDate",
-                   documents, screening_id as "screeningId", reviewed_by as "reviewedBy",
-                   reviewed_date as "reviewedDate", decision_reason as "decisionReason",
-                   tenant_id as "tenantId", created_at as "createdAt",
-                   updated_at as "updatedAt", last_updated as "lastUpdated"
+        cur.execute(f"""
+            SELECT {select_list(APPLICATION_FIELDS, fields)}
             FROM applications
+            {where}
             ORDER BY submitted_date DESC
-        """)
+        """, params)
         return [dict(row) for row in cur.fetchall()]
 
 
 def get_application_by_id(application_id: int) -> Optional[Dict[str, Any]]:
     """Get application by ID"""
     with get_db_cursor(commit=False) as cur:
-        cur.execute("""
-            SELECT id, status, submitted_date as "submittedDate",
-                   first_name as "firstName", last_name as "lastName",
-                   email, phone, date_of_birth as "dateOfBirth", ssn,
-                   property_id as "propertyId", property_name as "propertyName",
-                   desired_unit as "desiredUnit", desired_move_in_date as "desiredMoveInDate",
-                   lease_term as "leaseTerm", current_employer as "currentEmployer",
-                   job_title as "jobTitle", employment_start_date as "employmentStartDate",
-                   monthly_income as "monthlyIncome", employer_phone as "employerPhone",
-                   additional_income as "additionalIncome", current_address as "currentAddress",
-                   previous_addresses as "previousAddresses", emergency_contact as "emergencyContact",
-                   personal_references as "personalReferences", occupants, pets, vehicles,
-                   has_evictions as "hasEvictions", has_bankruptcy as "hasBankruptcy",
-                   has_criminal_history as "hasCriminalHistory", disclosure_notes as "disclosureNotes",
-                   background_check_consent as "backgroundCheckConsent",
-                   credit_check_consent as "creditCheckConsent",
-                   consent_signature as "consentSignature", consent_date as "consentDate",
-                   documents, screening_id as "screeningId", reviewed_by as "reviewedBy",
-                   reviewed_date as "reviewedDate", decision_reason as "decisionReason",
-                   tenant_id as "tenantId", created_at as "createdAt",
-                   updated_at as "updatedAt", last_updated as "lastUpdated"
+        execute_prepared(cur, 'application_by_id', f"""
+            SELECT {APPLICATION_COLUMNS}
             FROM applications
-            WHERE id = %s
+            WHERE id = $1
         """, (application_id,))
         row = cur.fetchone()
         return dict(row) if row else None
@@ -612,6 +1710,35 @@ def get_application_stats() -> Dict[str, Any]:
         return dict(cur.fetchone())
 
 
+# =============================================================================
+# TABLE VERSIONS
+# =============================================================================
+
+def get_table_versions(tables: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get change counters for the given tables (maintained by triggers in schema.sql).
+
+    Returns:
+        {table_name: {'version': int, 'updated_at': datetime}} - tables
+        without a row report version 0
+    """
+    with get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT table_name, version, updated_at
+            FROM table_versions
+            WHERE table_name = ANY(%s)
+        """, (list(tables),))
+        rows = {row['table_name']: row for row in cur.fetchall()}
+
+    return {
+        table: {
+            'version': rows[table]['version'] if table in rows else 0,
+            'updated_at': rows[table]['updated_at'] if table in rows else None,
+        }
+        for table in tables
+    }
+
+
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
@@ -619,7 +1746,7 @@ def get_application_stats() -> Dict[str, Any]:
 def test_connection() -> bool:
     """Test database connection"""
     try:
-        with get_db_cursor(commit=False) as cur:
+        with get_db_cursor(commit=False, primary=True) as cur:
             cur.execute("SELECT 1")
             return True
     except Exception as e:
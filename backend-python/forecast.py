@@ -0,0 +1,174 @@
+"""
+AdminEstate - Rent Forecast
+Purpose: Project rent income from lease schedules
+
+The forecast is a (lease x month) matrix evaluated with NumPy in one pass:
+- Months inside a lease (lease_start..lease_end) earn the contracted rent
+- After a lease ends the tenant renews with renewal_probability; otherwise
+  the unit is vacant for vacancy_months and then re-let
+- Rent grows by rent_growth per year from the first month after expiry
+  (compounded monthly over the months since expiry); contracted rent is flat
+- More than one renewal term after expiry, the expected occupancy settles
+  at the long-run rate term / (term + (1 - renewal_probability) * vacancy)
+- Leases without an end date are treated as ongoing; Pending leases start
+  earning at lease_start
+
+Lease arrays are loaded once per tenants table version (analytics_cache).
+"""
+
+import math
+from datetime import date
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+import analytics_cache
+import db
+
+# Forecast assumptions (overridable per request)
+DEFAULT_FORECAST_MONTHS = 12
+MAX_FORECAST_MONTHS = 120
+DEFAULT_RENEWAL_PROBABILITY = 0.7
+DEFAULT_VACANCY_MONTHS = 2
+DEFAULT_RENT_GROWTH = 0.03
+DEFAULT_RENEWAL_TERM = 12
+
+# get_rent_forecast() keyword arguments the scheduler snapshot is computed with
+DEFAULT_ASSUMPTIONS = {
+    'months': DEFAULT_FORECAST_MONTHS,
+    'renewal_probability': DEFAULT_RENEWAL_PROBABILITY,
+    'vacancy_months': DEFAULT_VACANCY_MONTHS,
+    'rent_growth': DEFAULT_RENT_GROWTH,
+}
+
+
+def _load_leases() -> Dict[str, np.ndarray]:
+    """Rent and lease start/end months (datetime64[M], NaT when unknown)"""
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT rent, lease_start, lease_end
+            FROM tenants
+            WHERE status IN ('Current', 'Pending')
+        """)
+        rows = cur.fetchall()
+
+    return {
+        'rent': np.array([row['rent'] for row in rows], dtype='float64'),
+        'start': np.array([row['lease_start'] for row in rows], dtype='datetime64[M]'),
+        'end': np.array([row['lease_end'] for row in rows], dtype='datetime64[M]'),
+    }
+
+
+def get_leases() -> Dict[str, np.ndarray]:
+    return analytics_cache.cached('lease_schedule', ('tenants',), _load_leases)
+
+
+def _month_offsets(months: np.ndarray, first_month: np.datetime64) -> np.ndarray:
+    """Months relative to first_month as float (NaN for NaT)"""
+    return np.where(np.isnat(months), np.nan, (months - first_month).astype('int64')).astype('float64')
+
+
+def project_income(rent: np.ndarray, start: np.ndarray, end: np.ndarray,
+                   months: int, renewal_probability: float, vacancy_months: int,
+                   rent_growth: float, renewal_term: int = DEFAULT_RENEWAL_TERM) -> Dict[str, np.ndarray]:
+    """
+    Expected income per month for every lease at once.
+
+    Args:
+        rent: Monthly rent per lease
+        start, end: Lease start/end as month offsets from the first forecast
+            month (float, NaN when unknown)
+
+    Returns:
+        Per-month arrays (length months): contracted, renewal, total income,
+        expected occupied leases and leases expiring that month
+    """
+    month = np.arange(months, dtype='float64')[np.newaxis, :]
+    start = np.where(np.isnan(start), -np.inf, start)[:, np.newaxis]
+    end = np.where(np.isnan(end), np.inf, end)[:, np.newaxis]
+    rent = np.nan_to_num(rent)[:, np.newaxis]
+
+    started = month >= start
+    in_contract = started & (month <= end)
+
+    # Months since expiry (>= 1 once the lease has ended)
+    since_end = month - end
+    p = renewal_probability
+    steady_state = renewal_term / (renewal_term + (1 - p) * vacancy_months)
+    after_end_occupancy = np.where(
+        since_end <= renewal_term,
+        p + (1 - p) * (since_end > vacancy_months),
+        steady_state,
+    )
+    expected_after_end = np.where(started & (since_end >= 1), after_end_occupancy, 0.0)
+    # Growth counts from the lease end, not from the first forecast month
+    grown_rent = rent * (1 + rent_growth) ** (np.maximum(since_end, 0) / 12)
+
+    contracted = (in_contract * rent).sum(axis=0)
+    renewal = (expected_after_end * grown_rent).sum(axis=0)
+    return {
+        'contracted_income': contracted,
+        'renewal_income': renewal,
+        'projected_income': contracted + renewal,
+        'expected_occupied': (in_contract + expected_after_end).sum(axis=0),
+        'expiring_leases': (since_end == 0).sum(axis=0),
+    }
+
+
+def get_rent_forecast(months: int = DEFAULT_FORECAST_MONTHS,
+                      renewal_probability: float = DEFAULT_RENEWAL_PROBABILITY,
+                      vacancy_months: int = DEFAULT_VACANCY_MONTHS,
+                      rent_growth: float = DEFAULT_RENT_GROWTH,
+                      as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Month-by-month expected rent income from current and pending leases.
+
+    Raises:
+        ValueError: Assumption out of range
+    """
+    if not all(math.isfinite(value) for value in (months, renewal_probability, vacancy_months, rent_growth)):
+        raise ValueError("Forecast assumptions must be finite numbers")
+    if not 1 <= months <= MAX_FORECAST_MONTHS:
+        raise ValueError(f"months must be between 1 and {MAX_FORECAST_MONTHS}")
+    if not 0 <= renewal_probability <= 1:
+        raise ValueError("renewalProbability must be between 0 and 1")
+    if vacancy_months < 0:
+        raise ValueError("vacancyMonths must not be negative")
+    if rent_growth <= -1:
+        raise ValueError("rentGrowth must be greater than -1")
+
+    leases = get_leases()
+    first_month = np.datetime64(as_of or date.today(), 'M')
+    projection = project_income(
+        leases['rent'],
+        _month_offsets(leases['start'], first_month),
+        _month_offsets(leases['end'], first_month),
+        months, renewal_probability, vacancy_months, rent_growth,
+    )
+
+    labels = (first_month + np.arange(months)).astype(str)
+    forecast = [
+        {
+            'month': label,
+            'projected_income': round(float(projection['projected_income'][i]), 2),
+            'contracted_income': round(float(projection['contracted_income'][i]), 2),
+            'renewal_income': round(float(projection['renewal_income'][i]), 2),
+            'expected_occupied_leases': round(float(projection['expected_occupied'][i]), 2),
+            'expiring_leases': int(projection['expiring_leases'][i]),
+        }
+        for i, label in enumerate(labels)
+    ]
+
+    return {
+        'current_monthly_income': forecast[0]['contracted_income'],
+        'forecast_months': months,
+        'lease_count': int(leases['rent'].size),
+        'assumptions': {
+            'renewal_probability': renewal_probability,
+            'vacancy_months': vacancy_months,
+            'rent_growth': rent_growth,
+            'renewal_term_months': DEFAULT_RENEWAL_TERM,
+        },
+        'total_projected_income': round(float(projection['projected_income'].sum()), 2),
+        'forecast': forecast,
+    }
@@ -0,0 +1,141 @@
+"""
+AdminEstate - Fast JSON Provider for Flask
+Purpose: Faster, type-aware JSON serialization for API responses
+
+This module provides:
+- FastJSONProvider: drop-in Flask JSON provider (app.json_provider_class)
+- Native handling of Decimal, date/datetime and numpy/pandas values, so
+  routes can return database rows and analytics results without coercion
+- orjson when installed, with a stdlib json fallback producing the same output
+
+Encoding rules:
+- Decimal          -> number (float); Flask's default provider sent strings
+- date / datetime  -> ISO 8601 string
+- numpy scalars    -> Python int / float / bool
+- numpy arrays     -> lists
+- NaN / Infinity   -> null
+- pandas NaT       -> null
+"""
+
+import json
+import math
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with the analytics stack
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - pandas ships with the analytics stack
+    pd = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Convert values the encoder does not know natively"""
+    if isinstance(obj, Decimal):
+        return float(obj) if obj.is_finite() else None
+    if pd is not None and obj is pd.NaT:
+        # NaT is a datetime subclass whose isoformat() is the string 'NaT'
+        return None
+    if isinstance(obj, (datetime, date, time)):
+        # Also covers pandas.Timestamp (a datetime subclass)
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _sanitize(obj: Any) -> Any:
+    """Replace NaN/Infinity with None for the stdlib encoder (orjson does this itself)"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _sanitize(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(value) for value in obj]
+    return obj
+
+
+class _StdlibEncoder(json.JSONEncoder):
+    def default(self, o):
+        value = _default(o)
+        return _sanitize(value)
+
+
+if orjson is not None:
+    # Datetimes go through _default: orjson would otherwise encode pandas NaT
+    # (a datetime subclass) itself, as the string "NaT"
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode obj to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data) -> Any:
+        """Decode JSON from str or bytes"""
+        return orjson.loads(data)
+else:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode obj to UTF-8 JSON bytes"""
+        return json.dumps(
+            _sanitize(obj), cls=_StdlibEncoder, ensure_ascii=False,
+            allow_nan=False, separators=(',', ':')
+        ).encode('utf-8')
+
+    def loads(data) -> Any:
+        """Decode JSON from str or bytes"""
+        return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Encode obj to a JSON string"""
+    return dumps_bytes(obj).decode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson (or the stdlib fallback).
+
+    Usage:
+        app.json_provider_class = FastJSONProvider
+        app.json = FastJSONProvider(app)
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Encode obj; json.dumps options (indent, sort_keys, ...) are honoured
+        by the stdlib encoder with the same encoding rules"""
+        if not kwargs:
+            return dumps(obj)
+        kwargs.setdefault('cls', _StdlibEncoder)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('allow_nan', False)
+        return json.dumps(_sanitize(obj), **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Build the jsonify() response straight from bytes (no str round-trip)"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
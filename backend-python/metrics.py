@@ -0,0 +1,103 @@
+"""
+AdminEstate - Portfolio Metric Kernels
+Purpose: NumPy-vectorized per-property metrics
+
+This module provides array-in/array-out kernels for the metrics the old
+pandas service computed row by row (archive/services/
+pandas_analytics_service.py calculate_advanced_metrics):
+- cap_rate          annual revenue / purchase price * 100
+- occupancy_rate    occupied / units * 100
+- price_per_unit    purchase price / units
+- revenue_per_unit  monthly revenue / units
+- noi               annual revenue - annual operating expenses
+- size_category     Small / Medium / Large / XLarge by unit count
+
+All divisions go through safe_divide: a zero, negative-zero or missing
+denominator (or a missing numerator) yields the fill value instead of
+inf/NaN, so results are always JSON-safe.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Unit-count bins (right-inclusive) and their labels; the last bin is open-ended
+SIZE_BINS = np.array([10, 20, 50])
+SIZE_LABELS = np.array(['Small', 'Medium', 'Large', 'XLarge'], dtype=object)
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype='float64')
+
+
+def safe_divide(numerator, denominator, fill: float = 0.0) -> np.ndarray:
+    """Element-wise numerator / denominator, fill where undefined"""
+    numerator = _as_float(numerator)
+    denominator = _as_float(denominator)
+    valid = (denominator != 0) & np.isfinite(denominator) & np.isfinite(numerator)
+    out = np.full(np.broadcast(numerator, denominator).shape, fill, dtype='float64')
+    np.divide(numerator, denominator, out=out, where=valid)
+    return out
+
+
+def cap_rate(monthly_revenue, purchase_price) -> np.ndarray:
+    """Estimated cap rate in percent (0 without a positive purchase price)"""
+    price = _as_float(purchase_price)
+    return safe_divide(_as_float(monthly_revenue) * 12 * 100, np.where(price > 0, price, 0))
+
+
+def occupancy_rate(occupied, units) -> np.ndarray:
+    """Occupied share of units in percent"""
+    return safe_divide(_as_float(occupied) * 100, units)
+
+
+def price_per_unit(purchase_price, units) -> np.ndarray:
+    return safe_divide(purchase_price, units)
+
+
+def revenue_per_unit(monthly_revenue, units) -> np.ndarray:
+    return safe_divide(monthly_revenue, units)
+
+
+def noi(monthly_revenue, annual_expenses=None) -> np.ndarray:
+    """Annual net operating income (missing revenue/expenses count as 0)"""
+    revenue = np.nan_to_num(_as_float(monthly_revenue) * 12)
+    if annual_expenses is None:
+        return revenue
+    return revenue - np.nan_to_num(_as_float(annual_expenses))
+
+
+def size_category(units) -> np.ndarray:
+    """Size label per property; None for missing or non-positive unit counts"""
+    units = _as_float(units)
+    labels = SIZE_LABELS[np.searchsorted(SIZE_BINS, np.nan_to_num(units), side='left')]
+    return np.where(np.isfinite(units) & (units > 0), labels, None)
+
+
+def property_metrics(df: pd.DataFrame, annual_expenses: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Per-property metric columns for a typed properties frame.
+
+    Args:
+        df: Frame with units, occupied, monthlyRevenue, purchasePrice columns
+            (see analytics_cache.get_properties_frame)
+        annual_expenses: Optional expenses aligned to df's index (NOI input)
+
+    Returns:
+        New DataFrame with the same index; df itself is not modified
+    """
+    units = df['units'].to_numpy()
+    monthly = df['monthlyRevenue'].to_numpy()
+    price = df['purchasePrice'].to_numpy()
+    expenses = None if annual_expenses is None else annual_expenses.reindex(df.index).to_numpy()
+
+    return pd.DataFrame({
+        'occupancy_rate': occupancy_rate(df['occupied'].to_numpy(), units),
+        'price_per_unit': price_per_unit(price, units),
+        'revenue_per_unit': revenue_per_unit(monthly, units),
+        'annual_revenue': np.nan_to_num(monthly * 12),
+        'cap_rate_estimate': cap_rate(monthly, price),
+        'noi': noi(monthly, expenses),
+        'size_category': size_category(units),
+    }, index=df.index)
@@ -0,0 +1,169 @@
+"""
+AdminEstate - Rent Roll
+Purpose: Tenant balances, days past due and receivables aging
+
+The ledger lives in PostgreSQL (see the RENT ROLL section of schema.sql):
+- tenant_ledger keeps total_charged / total_paid per tenant; payments are
+  posted by triggers on transactions as they are inserted
+- rent_charges holds one row per monthly charge with a running total, so
+  the unpaid charges of a tenant are an index range scan
+- accrue_rent() charges only months not charged yet; a ledger opens with
+  the tenant's balance, which covers the current month only if non-zero
+
+A new tenant is charged up to today when its ledger is created. Reads
+re-run accrue_rent() whenever the day or the tenants table version has
+changed since this process last ran it (months roll over, and status,
+rent or lease dates may have changed), and serve the rent roll and the
+aging report from those tables.
+"""
+
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import db
+
+# (label, min days past due, max days past due or None)
+AGING_BUCKETS = [
+    ('0-30', 0, 30),
+    ('31-60', 31, 60),
+    ('61-90', 61, 90),
+    ('90+', 91, None),
+]
+
+# (date, tenants table version) accrue_rent() last ran at in this process
+_accrued_at: Optional[Tuple[date, int]] = None
+_accrual_lock = threading.Lock()
+
+
+def accrue_rent(as_of: Optional[date] = None) -> int:
+    """Charge rent due up to as_of (default today); returns tenants charged"""
+    with db.get_db_cursor() as cur:
+        cur.execute("SELECT accrue_rent(%s) AS tenants", (as_of or date.today(),))
+        return cur.fetchone()['tenants']
+
+
+def ensure_accrued():
+    """Run accrue_rent() unless it already ran today at the current tenants version"""
+    global _accrued_at
+    today = date.today()
+    key = (today, db.get_table_versions(['tenants'])['tenants']['version'])
+    if _accrued_at == key:
+        return
+    with _accrual_lock:
+        if _accrued_at != key:
+            accrue_rent(today)
+            _accrued_at = key
+
+
+def _bucket_columns() -> str:
+    columns = []
+    for label, low, high in AGING_BUCKETS:
+        condition = f"days >= {low}" + (f" AND days <= {high}" if high is not None else '')
+        columns.append(f'COALESCE(SUM(unpaid) FILTER (WHERE {condition}), 0) AS "{label}"')
+    return ',\n                '.join(columns)
+
+
+def _check_as_of(as_of: Optional[date]) -> date:
+    """Default as_of to today and reject any other date: the ledger totals are
+    current (rent accrued up to today, every payment posted), so another date
+    would mix them with charges or payments from after it"""
+    today = date.today()
+    if as_of is None:
+        return today
+    if as_of != today:
+        raise ValueError(
+            f"asOf {as_of.isoformat()} is not today (the rent roll is only available as of today)"
+        )
+    return as_of
+
+
+def get_rent_roll(as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Every tenant with rent, ledger totals, balance and days past due.
+
+    Raises:
+        ValueError: as_of is not today
+    """
+    as_of = _check_as_of(as_of)
+    ensure_accrued()
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute("""
+            SELECT
+                t.id AS "tenantId",
+                t.name,
+                t.property_name AS property,
+                t.unit,
+                t.rent,
+                t.status,
+                t.lease_start AS "leaseStart",
+                t.lease_end AS "leaseEnd",
+                l.total_charged AS "totalCharged",
+                l.total_paid AS "totalPaid",
+                l.balance,
+                l.charged_through AS "chargedThrough",
+                GREATEST(COALESCE(%(as_of)s::date - oldest.due_date, 0), 0) AS "daysPastDue"
+            FROM tenants t
+            JOIN tenant_ledger l ON l.tenant_id = t.id
+            LEFT JOIN LATERAL (
+                SELECT MIN(c.due_date) AS due_date
+                FROM rent_charges c
+                WHERE c.tenant_id = l.tenant_id
+                  AND c.cumulative_amount > l.total_paid
+            ) oldest ON TRUE
+            ORDER BY t.property_name, t.unit
+        """, {'as_of': as_of})
+        return [dict(row) for row in cur.fetchall()]
+
+
+def get_aging_report(as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Receivables aging for the whole portfolio.
+
+    Only tenants with a positive balance are read (partial index on
+    tenant_ledger), and for each only its unpaid charges.
+
+    Returns:
+        {'as_of', 'buckets': {label: amount, ..., 'total': amount},
+         'tenant_count', 'tenants': [per-tenant buckets, oldest first]}
+
+    Raises:
+        ValueError: as_of is not today
+    """
+    as_of = _check_as_of(as_of)
+    ensure_accrued()
+    with db.get_db_cursor(commit=False) as cur:
+        cur.execute(f"""
+            SELECT
+                t.id AS "tenantId",
+                t.name,
+                t.property_name AS property,
+                t.unit,
+                l.balance,
+                MAX(days) AS "daysPastDue",
+                {_bucket_columns()}
+            FROM tenant_ledger l
+            JOIN tenants t ON t.id = l.tenant_id
+            JOIN LATERAL (
+                SELECT
+                    LEAST(c.amount, c.cumulative_amount - l.total_paid) AS unpaid,
+                    %(as_of)s::date - c.due_date AS days
+                FROM rent_charges c
+                WHERE c.tenant_id = l.tenant_id
+                  AND c.cumulative_amount > l.total_paid
+                  AND c.due_date <= %(as_of)s::date
+            ) unpaid_charges ON TRUE
+            WHERE l.total_charged > l.total_paid
+            GROUP BY t.id, l.tenant_id
+            ORDER BY "daysPastDue" DESC, l.balance DESC
+        """, {'as_of': as_of})
+        tenants = [dict(row) for row in cur.fetchall()]
+
+    buckets = {label: sum(row[label] for row in tenants) for label, _, _ in AGING_BUCKETS}
+    buckets['total'] = sum(buckets.values())
+    return {
+        'as_of': as_of,
+        'buckets': buckets,
+        'tenant_count': len(tenants),
+        'tenants': tenants,
+    }
@@ -2,7 +2,17 @@
 -- Created: 2025-11-09
 -- Purpose: Replace JSON file storage with PostgreSQL database
 
+-- Extensions
+CREATE EXTENSION IF NOT EXISTS pg_trgm; -- trigram indexes for substring search
+
 -- Drop existing tables if they exist (for clean migration)
+DROP TABLE IF EXISTS table_versions CASCADE;
+DROP TABLE IF EXISTS portfolio_rollup CASCADE;
+DROP TABLE IF EXISTS transaction_monthly CASCADE;
+DROP TABLE IF EXISTS rent_charges CASCADE;
+DROP TABLE IF EXISTS tenant_ledger CASCADE;
+DROP TABLE IF EXISTS message_participants CASCADE;
+DROP TABLE IF EXISTS mailboxes CASCADE;
 DROP TABLE IF EXISTS documents CASCADE;
 DROP TABLE IF EXISTS transactions CASCADE;
 DROP TABLE IF EXISTS messages CASCADE;
@@ -33,6 +43,11 @@ CREATE TABLE properties (
 CREATE INDEX idx_properties_name ON properties(name);
 CREATE INDEX idx_properties_type ON properties(type);
 CREATE INDEX idx_properties_status ON properties(status);
+-- Keyset pagination (matches PROPERTY_KEYSET in db.py; NULL created_at sorts last)
+CREATE INDEX idx_properties_keyset ON properties (
+    (COALESCE(created_at, '0001-01-01 00:00:00'::timestamp)) DESC,
+    id DESC
+);
 
 COMMENT ON TABLE properties IS 'Property portfolio with constraints and validation';
 COMMENT ON COLUMN properties.occupied IS 'Current occupied units (constrained to be <= total units)';
@@ -66,6 +81,11 @@ CREATE INDEX idx_tenants_email ON tenants(email);
 CREATE INDEX idx_tenants_property_id ON tenants(property_id);
 CREATE INDEX idx_tenants_status ON tenants(status);
 CREATE INDEX idx_tenants_property_unit ON tenants(property_name, unit);
+-- Keyset pagination (matches TENANT_KEYSET in db.py; NULL created_at sorts last)
+CREATE INDEX idx_tenants_keyset ON tenants (
+    (COALESCE(created_at, '0001-01-01 00:00:00'::timestamp)) DESC,
+    id DESC
+);
 
 COMMENT ON TABLE tenants IS 'Tenant records with unique email and property relationships';
 COMMENT ON COLUMN tenants.email IS 'Unique email used for Tenant Portal login';
@@ -102,6 +122,11 @@ CREATE INDEX idx_work_orders_status ON work_orders(status);
 CREATE INDEX idx_work_orders_category ON work_orders(category);
 CREATE INDEX idx_work_orders_message_id ON work_orders(message_id);
 CREATE INDEX idx_work_orders_date ON work_orders(date);
+CREATE INDEX idx_work_orders_keyset ON work_orders(date DESC, id DESC); -- keyset pagination
+-- Resolution-time analytics read only completed orders (index-only scan)
+CREATE INDEX idx_work_orders_completed ON work_orders(category)
+    INCLUDE (submitted_at, approved_at, date, updated_at)
+    WHERE status = 'Completed';
 
 COMMENT ON TABLE work_orders IS 'Maintenance work orders from manual entry or tenant portal';
 COMMENT ON COLUMN work_orders.photos IS 'Array of file paths to uploaded photos';
@@ -143,6 +168,22 @@ CREATE INDEX idx_messages_read ON messages(read);
 CREATE INDEX idx_messages_work_order_id ON messages(work_order_id);
 CREATE INDEX idx_messages_date ON messages(date DESC);
 
+-- Keyset pagination (matches MESSAGE_KEYSET in db.py)
+CREATE INDEX idx_messages_keyset ON messages (
+    (COALESCE(submitted_at, '0001-01-01 00:00:00'::timestamp)) DESC,
+    (COALESCE(created_at, '0001-01-01 00:00:00'::timestamp)) DESC,
+    id DESC
+);
+
+-- Tenant maintenance history (get_tenant_maintenance_requests in db.py): the
+-- tenant portal filters by unit. A partial filter index (not covering - the
+-- listing reads the message body and maintenance_data from the row) that
+-- returns a unit's requests already in the listing's sort order. The
+-- tenantEmail filter uses idx_messages_from_email.
+CREATE INDEX idx_messages_maintenance_unit ON messages
+    (unit, submitted_at DESC NULLS LAST, created_at DESC)
+    WHERE type = 'maintenance_request';
+
 -- GIN index for JSONB queries
 CREATE INDEX idx_messages_maintenance_data ON messages USING GIN (maintenance_data);
 
@@ -225,6 +266,14 @@ CREATE INDEX idx_applications_status ON applications(status);
 CREATE INDEX idx_applications_property_id ON applications(property_id);
 CREATE INDEX idx_applications_submitted_date ON applications(submitted_date);
 
+-- Trigram index for ?search= (ILIKE '%term%' on any of these columns)
+CREATE INDEX idx_applications_search_trgm ON applications USING GIN (
+    first_name gin_trgm_ops,
+    last_name gin_trgm_ops,
+    email gin_trgm_ops,
+    property_name gin_trgm_ops
+);
+
 -- GIN indexes for JSONB queries
 CREATE INDEX idx_applications_pets ON applications USING GIN (pets);
 CREATE INDEX idx_applications_vehicles ON applications USING GIN (vehicles);
@@ -255,6 +304,12 @@ CREATE INDEX idx_transactions_property_id ON transactions(property_id);
 CREATE INDEX idx_transactions_tenant_id ON transactions(tenant_id);
 CREATE INDEX idx_transactions_type ON transactions(type);
 CREATE INDEX idx_transactions_date ON transactions(date DESC);
+-- Keyset pagination (matches TRANSACTION_KEYSET in db.py; NULL created_at sorts last)
+CREATE INDEX idx_transactions_keyset ON transactions (
+    date DESC,
+    (COALESCE(created_at, '0001-01-01 00:00:00'::timestamp)) DESC,
+    id DESC
+);
 
 COMMENT ON TABLE transactions IS 'Financial transactions for rent payments and expenses';
 
@@ -317,6 +372,590 @@ CREATE TRIGGER update_applications_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- =============================================================================
+-- TABLE VERSIONS (conditional GET / ETag support)
+-- =============================================================================
+
+-- One row per table; version is bumped by a statement-level trigger on every
+-- INSERT/UPDATE/DELETE, so the API can answer If-None-Match with a single
+-- primary-key lookup instead of re-reading the table.
+CREATE TABLE table_versions (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO table_versions (table_name) VALUES
+    ('properties'), ('tenants'), ('work_orders'), ('messages'),
+    ('applications'), ('transactions'), ('documents');
+
+COMMENT ON TABLE table_versions IS 'Per-table change counters used for API ETags';
+
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, version, updated_at)
+    VALUES (TG_TABLE_NAME, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = table_versions.version + 1,
+        updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bump_properties_version
+    AFTER INSERT OR UPDATE OR DELETE ON properties
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_tenants_version
+    AFTER INSERT OR UPDATE OR DELETE ON tenants
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_work_orders_version
+    AFTER INSERT OR UPDATE OR DELETE ON work_orders
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_messages_version
+    AFTER INSERT OR UPDATE OR DELETE ON messages
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_applications_version
+    AFTER INSERT OR UPDATE OR DELETE ON applications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_transactions_version
+    AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_documents_version
+    AFTER INSERT OR UPDATE OR DELETE ON documents
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+-- =============================================================================
+-- PORTFOLIO ROLLUP (dashboard KPIs maintained incrementally)
+-- =============================================================================
+
+-- One row per property type plus a global '__all__' row. Row triggers on
+-- properties apply the delta of every INSERT/UPDATE/DELETE, so dashboard
+-- reads touch O(number of types) rows regardless of portfolio size.
+CREATE TABLE portfolio_rollup (
+    rollup_key VARCHAR(50) PRIMARY KEY, -- property type, or '__all__'
+    property_count BIGINT NOT NULL DEFAULT 0,
+    total_units BIGINT NOT NULL DEFAULT 0,
+    occupied_units BIGINT NOT NULL DEFAULT 0,
+    total_revenue NUMERIC NOT NULL DEFAULT 0,     -- SUM(monthly_revenue)
+    revenue_count BIGINT NOT NULL DEFAULT 0,      -- COUNT(monthly_revenue)
+    total_value NUMERIC NOT NULL DEFAULT 0,       -- SUM(purchase_price)
+    value_count BIGINT NOT NULL DEFAULT 0,        -- COUNT(purchase_price)
+    cap_rate_sum NUMERIC NOT NULL DEFAULT 0,      -- SUM of per-property cap rate
+    cap_rate_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE portfolio_rollup IS 'Per-type and global property aggregates kept current by triggers';
+
+-- Add (sign = 1) or remove (sign = -1) one property's contribution
+CREATE OR REPLACE FUNCTION portfolio_rollup_apply(
+    p_key VARCHAR, p_sign INTEGER, p_units INTEGER, p_occupied INTEGER,
+    p_revenue NUMERIC, p_price NUMERIC
+)
+RETURNS VOID AS $$
+DECLARE
+    -- Same per-property cap rate the dashboard averages (NULL revenue is skipped)
+    v_cap_rate NUMERIC := CASE WHEN p_price > 0 THEN p_revenue * 12 / p_price * 100 ELSE 0 END;
+BEGIN
+    INSERT INTO portfolio_rollup AS r (
+        rollup_key, property_count, total_units, occupied_units,
+        total_revenue, revenue_count, total_value, value_count,
+        cap_rate_sum, cap_rate_count
+    )
+    VALUES (
+        p_key, p_sign, p_sign * p_units, p_sign * p_occupied,
+        p_sign * COALESCE(p_revenue, 0), p_sign * (p_revenue IS NOT NULL)::INTEGER,
+        p_sign * COALESCE(p_price, 0), p_sign * (p_price IS NOT NULL)::INTEGER,
+        p_sign * COALESCE(v_cap_rate, 0), p_sign * (v_cap_rate IS NOT NULL)::INTEGER
+    )
+    ON CONFLICT (rollup_key) DO UPDATE SET
+        property_count = r.property_count + EXCLUDED.property_count,
+        total_units = r.total_units + EXCLUDED.total_units,
+        occupied_units = r.occupied_units + EXCLUDED.occupied_units,
+        total_revenue = r.total_revenue + EXCLUDED.total_revenue,
+        revenue_count = r.revenue_count + EXCLUDED.revenue_count,
+        total_value = r.total_value + EXCLUDED.total_value,
+        value_count = r.value_count + EXCLUDED.value_count,
+        cap_rate_sum = r.cap_rate_sum + EXCLUDED.cap_rate_sum,
+        cap_rate_count = r.cap_rate_count + EXCLUDED.cap_rate_count,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_portfolio_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM portfolio_rollup_apply(OLD.type, -1, OLD.units, OLD.occupied, OLD.monthly_revenue, OLD.purchase_price);
+        PERFORM portfolio_rollup_apply('__all__', -1, OLD.units, OLD.occupied, OLD.monthly_revenue, OLD.purchase_price);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM portfolio_rollup_apply(NEW.type, 1, NEW.units, NEW.occupied, NEW.monthly_revenue, NEW.purchase_price);
+        PERFORM portfolio_rollup_apply('__all__', 1, NEW.units, NEW.occupied, NEW.monthly_revenue, NEW.purchase_price);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintain_portfolio_rollup
+    AFTER INSERT OR UPDATE OF type, units, occupied, monthly_revenue, purchase_price OR DELETE ON properties
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_portfolio_rollup();
+
+-- Recompute the rollup from scratch (after bulk loads with triggers disabled,
+-- or to repair drift): SELECT rebuild_portfolio_rollup();
+CREATE OR REPLACE FUNCTION rebuild_portfolio_rollup()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM portfolio_rollup;
+    INSERT INTO portfolio_rollup (
+        rollup_key, property_count, total_units, occupied_units,
+        total_revenue, revenue_count, total_value, value_count,
+        cap_rate_sum, cap_rate_count
+    )
+    SELECT
+        CASE WHEN GROUPING(type) = 1 THEN '__all__' ELSE type END,
+        COUNT(*), COALESCE(SUM(units), 0), COALESCE(SUM(occupied), 0),
+        COALESCE(SUM(monthly_revenue), 0), COUNT(monthly_revenue),
+        COALESCE(SUM(purchase_price), 0), COUNT(purchase_price),
+        COALESCE(SUM(CASE WHEN purchase_price > 0 THEN monthly_revenue * 12 / purchase_price * 100 ELSE 0 END), 0),
+        COUNT(CASE WHEN purchase_price > 0 THEN monthly_revenue * 12 / purchase_price * 100 ELSE 0 END)
+    FROM properties
+    GROUP BY GROUPING SETS ((type), ());
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_portfolio_rollup();
+
+-- =============================================================================
+-- TRANSACTION MONTHLY LEDGER (financial trends)
+-- =============================================================================
+
+-- Transactions pre-bucketed by (property, month, type). Statement-level
+-- triggers with transition tables fold each INSERT/UPDATE/DELETE into the
+-- buckets in one grouped upsert, so bulk loads cost one pass. Trend queries
+-- for month/quarter/year read these rows instead of the whole ledger.
+CREATE TABLE transaction_monthly (
+    property_id BIGINT NOT NULL, -- 0 for transactions without a property
+    month DATE NOT NULL,         -- first day of the month
+    type VARCHAR(50) NOT NULL,
+    amount NUMERIC NOT NULL DEFAULT 0,
+    transaction_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (property_id, month, type)
+);
+
+CREATE INDEX idx_transaction_monthly_month ON transaction_monthly(month);
+
+COMMENT ON TABLE transaction_monthly IS 'Monthly transaction totals per property and type, kept current by triggers';
+
+CREATE OR REPLACE FUNCTION maintain_transaction_monthly()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO transaction_monthly AS m (property_id, month, type, amount, transaction_count)
+        SELECT COALESCE(property_id, 0), date_trunc('month', date)::date, type, -SUM(amount), -COUNT(*)
+        FROM old_rows
+        GROUP BY 1, 2, 3
+        ON CONFLICT (property_id, month, type) DO UPDATE SET
+            amount = m.amount + EXCLUDED.amount,
+            transaction_count = m.transaction_count + EXCLUDED.transaction_count;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO transaction_monthly AS m (property_id, month, type, amount, transaction_count)
+        SELECT COALESCE(property_id, 0), date_trunc('month', date)::date, type, SUM(amount), COUNT(*)
+        FROM new_rows
+        GROUP BY 1, 2, 3
+        ON CONFLICT (property_id, month, type) DO UPDATE SET
+            amount = m.amount + EXCLUDED.amount,
+            transaction_count = m.transaction_count + EXCLUDED.transaction_count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger, hence three triggers
+CREATE TRIGGER transaction_monthly_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_transaction_monthly();
+
+CREATE TRIGGER transaction_monthly_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_transaction_monthly();
+
+CREATE TRIGGER transaction_monthly_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_transaction_monthly();
+
+-- Recompute the monthly ledger from transactions: SELECT rebuild_transaction_monthly();
+CREATE OR REPLACE FUNCTION rebuild_transaction_monthly()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM transaction_monthly;
+    INSERT INTO transaction_monthly (property_id, month, type, amount, transaction_count)
+    SELECT COALESCE(property_id, 0), date_trunc('month', date)::date, type, SUM(amount), COUNT(*)
+    FROM transactions
+    GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- RENT ROLL (tenant ledger and aging)
+-- =============================================================================
+
+-- Running totals per tenant. Payments posted to transactions are folded in by
+-- triggers; monthly rent is charged by accrue_rent(), which only touches
+-- months not yet charged. Balances never require a ledger rescan.
+CREATE TABLE tenant_ledger (
+    tenant_id BIGINT PRIMARY KEY REFERENCES tenants(id) ON DELETE CASCADE,
+    total_charged NUMERIC NOT NULL DEFAULT 0,
+    total_paid NUMERIC NOT NULL DEFAULT 0,
+    balance NUMERIC GENERATED ALWAYS AS (total_charged - total_paid) STORED,
+    -- First day of the last month rent was charged for. A ledger opens at the
+    -- previous month (the current one if a balance is imported, see
+    -- create_tenant_ledger): tenants.balance covers everything owed until then
+    charged_through DATE NOT NULL DEFAULT (date_trunc('month', CURRENT_DATE) - INTERVAL '1 month')::date,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_tenant_ledger_owing ON tenant_ledger(tenant_id) WHERE total_charged > total_paid;
+
+COMMENT ON TABLE tenant_ledger IS 'Per-tenant charged/paid totals maintained by triggers and accrue_rent()';
+
+-- Individual charges with a per-tenant running total. Payments settle the
+-- oldest charges first, so a charge is (partly) unpaid exactly when its
+-- cumulative_amount exceeds the tenant's total_paid.
+CREATE TABLE rent_charges (
+    id BIGSERIAL PRIMARY KEY,
+    tenant_id BIGINT NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+    kind VARCHAR(20) NOT NULL DEFAULT 'rent' CHECK (kind IN ('rent', 'opening')),
+    due_date DATE NOT NULL,
+    amount NUMERIC NOT NULL,
+    cumulative_amount NUMERIC NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE(tenant_id, kind, due_date)
+);
+
+-- Unpaid charges of a tenant: range scan on cumulative_amount > total_paid
+CREATE INDEX idx_rent_charges_unpaid ON rent_charges(tenant_id, cumulative_amount);
+
+COMMENT ON TABLE rent_charges IS 'Rent charges per tenant with running totals for FIFO aging';
+
+-- New tenants get a ledger row; an imported balance becomes an opening charge
+-- due today (or a credit when negative) and covers the current month, so rent
+-- accrues from the next month on. Without one the tenant is settled up to the
+-- previous month and the current month is charged right away (a future lease
+-- still accrues from its first month, see accrue_rent)
+CREATE OR REPLACE FUNCTION create_tenant_ledger()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_opening NUMERIC := COALESCE(NEW.balance, 0);
+BEGIN
+    INSERT INTO tenant_ledger (tenant_id, total_charged, total_paid, charged_through)
+    VALUES (NEW.id, GREATEST(v_opening, 0), GREATEST(-v_opening, 0),
+            CASE WHEN v_opening <> 0
+                 THEN date_trunc('month', CURRENT_DATE)
+                 ELSE date_trunc('month', CURRENT_DATE) - INTERVAL '1 month'
+            END::date)
+    ON CONFLICT (tenant_id) DO NOTHING;
+
+    IF v_opening > 0 THEN
+        INSERT INTO rent_charges (tenant_id, kind, due_date, amount, cumulative_amount)
+        VALUES (NEW.id, 'opening', CURRENT_DATE, v_opening, v_opening)
+        ON CONFLICT DO NOTHING;
+    END IF;
+
+    PERFORM accrue_rent(CURRENT_DATE, NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER create_tenant_ledger
+    AFTER INSERT ON tenants
+    FOR EACH ROW
+    EXECUTE FUNCTION create_tenant_ledger();
+
+-- Payments ('payment'/'income') credit the tenant, refunds reverse a credit.
+-- Same transition-table pattern as maintain_transaction_monthly().
+CREATE OR REPLACE FUNCTION post_tenant_payments()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO tenant_ledger AS l (tenant_id, total_paid)
+        SELECT tenant_id, -SUM(CASE WHEN type = 'refund' THEN -amount ELSE amount END)
+        FROM old_rows
+        WHERE tenant_id IS NOT NULL AND type IN ('payment', 'income', 'refund')
+        GROUP BY tenant_id
+        ON CONFLICT (tenant_id) DO UPDATE SET
+            total_paid = l.total_paid + EXCLUDED.total_paid,
+            updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO tenant_ledger AS l (tenant_id, total_paid)
+        SELECT tenant_id, SUM(CASE WHEN type = 'refund' THEN -amount ELSE amount END)
+        FROM new_rows
+        WHERE tenant_id IS NOT NULL AND type IN ('payment', 'income', 'refund')
+        GROUP BY tenant_id
+        ON CONFLICT (tenant_id) DO UPDATE SET
+            total_paid = l.total_paid + EXCLUDED.total_paid,
+            updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER post_tenant_payments_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION post_tenant_payments();
+
+CREATE TRIGGER post_tenant_payments_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION post_tenant_payments();
+
+CREATE TRIGGER post_tenant_payments_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION post_tenant_payments();
+
+-- Charge monthly rent (due on the 1st) for current tenants, from the month
+-- after charged_through (or the lease start, if later) up to p_as_of / lease end.
+-- Months already charged are skipped, so repeated calls are cheap.
+-- p_tenant_id limits it to one tenant (create_tenant_ledger).
+-- Returns the number of tenants charged.
+CREATE OR REPLACE FUNCTION accrue_rent(p_as_of DATE DEFAULT CURRENT_DATE,
+                                       p_tenant_id BIGINT DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_tenants INTEGER;
+BEGIN
+    WITH due AS (
+        SELECT l.tenant_id, m::date AS due_date, t.rent AS amount, l.total_charged
+        FROM tenant_ledger l
+        JOIN tenants t ON t.id = l.tenant_id
+        CROSS JOIN LATERAL generate_series(
+            GREATEST(l.charged_through + INTERVAL '1 month',
+                     date_trunc('month', t.lease_start::timestamp)),
+            date_trunc('month', LEAST(p_as_of, COALESCE(t.lease_end, p_as_of))::timestamp),
+            INTERVAL '1 month'
+        ) AS m
+        WHERE t.status = 'Current'
+          AND l.charged_through < date_trunc('month', p_as_of)
+          AND (p_tenant_id IS NULL OR l.tenant_id = p_tenant_id)
+    ),
+    charged AS (
+        INSERT INTO rent_charges (tenant_id, kind, due_date, amount, cumulative_amount)
+        SELECT tenant_id, 'rent', due_date, amount,
+               total_charged + SUM(amount) OVER (PARTITION BY tenant_id ORDER BY due_date)
+        FROM due
+        ON CONFLICT (tenant_id, kind, due_date) DO NOTHING
+        RETURNING tenant_id, due_date, amount
+    ),
+    totals AS (
+        SELECT tenant_id, SUM(amount) AS amount, MAX(due_date) AS charged_through
+        FROM charged
+        GROUP BY tenant_id
+    )
+    UPDATE tenant_ledger l
+    SET total_charged = l.total_charged + totals.amount,
+        charged_through = totals.charged_through,
+        updated_at = CURRENT_TIMESTAMP
+    FROM totals
+    WHERE l.tenant_id = totals.tenant_id;
+
+    GET DIAGNOSTICS v_tenants = ROW_COUNT;
+    RETURN v_tenants;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- MAILBOXES (per-participant inbox index and unread counters)
+-- =============================================================================
+
+-- One row per (message, participant email). A message sent to its own
+-- sender has a single 'to' row. Only recipients can have unread mail;
+-- the sender's copy is always read.
+CREATE TABLE message_participants (
+    message_id BIGINT NOT NULL REFERENCES messages(id) ON DELETE CASCADE,
+    email VARCHAR(255) NOT NULL,
+    role VARCHAR(10) NOT NULL CHECK (role IN ('from', 'to')),
+    read BOOLEAN NOT NULL DEFAULT FALSE,
+    submitted_at TIMESTAMP NOT NULL, -- COALESCE(submitted_at, sent_at, created_at) of the message
+    PRIMARY KEY (message_id, email)
+);
+
+-- Unread listing / badge: WHERE email = ? AND read = FALSE ORDER BY submitted_at DESC
+CREATE INDEX idx_message_participants_unread ON message_participants(email, read, submitted_at DESC);
+-- Full inbox listing (keyset pagination, matches INBOX_KEYSET in db.py)
+CREATE INDEX idx_message_participants_inbox ON message_participants(email, submitted_at DESC, message_id DESC);
+
+CREATE TABLE mailboxes (
+    email VARCHAR(255) PRIMARY KEY,
+    total_count BIGINT NOT NULL DEFAULT 0,
+    unread_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE message_participants IS 'Inbox index: one row per message and participant email';
+COMMENT ON TABLE mailboxes IS 'Per-email message and unread counters kept current by triggers on messages';
+
+CREATE OR REPLACE FUNCTION mailbox_add(p_email VARCHAR, p_total INTEGER, p_unread INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO mailboxes AS b (email, total_count, unread_count)
+    VALUES (p_email, p_total, p_unread)
+    ON CONFLICT (email) DO UPDATE SET
+        total_count = b.total_count + EXCLUDED.total_count,
+        unread_count = b.unread_count + EXCLUDED.unread_count,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_mailboxes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_unread INTEGER;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_unread := (NOT COALESCE(NEW.read, FALSE))::INTEGER;
+        IF NEW.to_email IS NOT NULL THEN
+            INSERT INTO message_participants (message_id, email, role, read, submitted_at)
+            VALUES (NEW.id, NEW.to_email, 'to', COALESCE(NEW.read, FALSE),
+                    COALESCE(NEW.submitted_at, NEW.sent_at, NEW.created_at, CURRENT_TIMESTAMP));
+            PERFORM mailbox_add(NEW.to_email, 1, v_unread);
+        END IF;
+        IF NEW.from_email IS NOT NULL AND NEW.to_email IS DISTINCT FROM NEW.from_email THEN
+            INSERT INTO message_participants (message_id, email, role, read, submitted_at)
+            VALUES (NEW.id, NEW.from_email, 'from', TRUE,
+                    COALESCE(NEW.submitted_at, NEW.sent_at, NEW.created_at, CURRENT_TIMESTAMP));
+            PERFORM mailbox_add(NEW.from_email, 1, 0);
+        END IF;
+
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Only the read flag changes after insert (mark_message_as_read)
+        IF NEW.to_email IS NOT NULL AND COALESCE(OLD.read, FALSE) <> COALESCE(NEW.read, FALSE) THEN
+            UPDATE message_participants
+            SET read = COALESCE(NEW.read, FALSE)
+            WHERE message_id = NEW.id AND email = NEW.to_email;
+            PERFORM mailbox_add(NEW.to_email, 0, CASE WHEN COALESCE(NEW.read, FALSE) THEN -1 ELSE 1 END);
+        END IF;
+
+    ELSIF TG_OP = 'DELETE' THEN
+        IF OLD.to_email IS NOT NULL THEN
+            PERFORM mailbox_add(OLD.to_email, -1, -((NOT COALESCE(OLD.read, FALSE))::INTEGER));
+        END IF;
+        IF OLD.from_email IS NOT NULL AND OLD.to_email IS DISTINCT FROM OLD.from_email THEN
+            PERFORM mailbox_add(OLD.from_email, -1, 0);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintain_mailboxes
+    AFTER INSERT OR UPDATE OF read OR DELETE ON messages
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_mailboxes();
+
+-- =============================================================================
+-- CHANGE FEED (LISTEN/NOTIFY for Server-Sent Events)
+-- =============================================================================
+
+-- Every committed row change on these tables sends a compact JSON payload on
+-- the 'adminestate_changes' channel (delivered at commit, dropped on
+-- rollback). change_feed.py LISTENs on one connection and fans the payloads
+-- out to /api/events subscribers. "emails" lists the people a change
+-- concerns, for per-tenant filtering; clients refetch the row by id.
+CREATE OR REPLACE FUNCTION notify_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row JSONB;
+    v_payload JSONB;
+BEGIN
+    v_row := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+    v_payload := jsonb_build_object(
+        'table', TG_TABLE_NAME,
+        'op', lower(TG_OP),
+        'id', v_row->'id'
+    );
+
+    IF TG_TABLE_NAME = 'messages' THEN
+        v_payload := v_payload || jsonb_build_object(
+            'emails', to_jsonb(array_remove(ARRAY[v_row->>'from_email', v_row->>'to_email'], NULL)),
+            'type', v_row->'type',
+            'status', v_row->'status',
+            'read', v_row->'read'
+        );
+    ELSIF TG_TABLE_NAME = 'work_orders' THEN
+        -- Tenant portal work orders belong to the sender of their request
+        v_payload := v_payload || jsonb_build_object(
+            'emails', COALESCE((
+                SELECT jsonb_build_array(m.from_email)
+                FROM messages m
+                WHERE m.id = (v_row->>'message_id')::BIGINT
+            ), '[]'::jsonb),
+            'status', v_row->'status',
+            'messageId', v_row->'message_id'
+        );
+    ELSIF TG_TABLE_NAME = 'tenants' THEN
+        v_payload := v_payload || jsonb_build_object(
+            'emails', jsonb_build_array(v_row->'email'),
+            'status', v_row->'status',
+            'propertyId', v_row->'property_id'
+        );
+    ELSE
+        v_payload := v_payload || jsonb_build_object('emails', '[]'::jsonb);
+    END IF;
+
+    PERFORM pg_notify('adminestate_changes', v_payload::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_messages_change
+    AFTER INSERT OR UPDATE OR DELETE ON messages
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER notify_work_orders_change
+    AFTER INSERT OR UPDATE OR DELETE ON work_orders
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER notify_tenants_change
+    AFTER INSERT OR UPDATE OR DELETE ON tenants
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER notify_properties_change
+    AFTER INSERT OR UPDATE OR DELETE ON properties
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_change();
+
 -- Function to validate occupied units constraint
 CREATE OR REPLACE FUNCTION validate_occupied_units()
 RETURNS TRIGGER AS $$
@@ -374,9 +1013,9 @@ BEGIN
     RAISE NOTICE '========================================';
     RAISE NOTICE 'AdminEstate Database Schema Created Successfully';
     RAISE NOTICE '========================================';
-    RAISE NOTICE 'Tables Created: 7';
+    RAISE NOTICE 'Tables Created: 14';
     RAISE NOTICE 'Indexes Created: 35+';
-    RAISE NOTICE 'Triggers Created: 5';
+    RAISE NOTICE 'Triggers Created: 25';
     RAISE NOTICE 'Views Created: 1';
     RAISE NOTICE '';
     RAISE NOTICE 'Next Steps:';
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The backend modules are imported as top-level modules (see app_simplex.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
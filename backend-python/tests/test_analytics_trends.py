@@ -0,0 +1,7 @@
+import app_simplex
+
+
+def test_malformed_property_id_is_rejected():
+    response = app_simplex.app.test_client().get('/api/analytics/trends?propertyId=abc')
+    assert response.status_code == 400
+    assert 'propertyId' in response.get_json()['error']
@@ -0,0 +1,18 @@
+import app_simplex
+import db
+
+
+def test_property_id_is_matched_as_given(monkeypatch):
+    calls = []
+    monkeypatch.setattr(db, 'get_all_applications', lambda **kwargs: calls.append(kwargs) or [])
+
+    response = app_simplex.app.test_client().get('/api/applications?propertyId=007')
+    assert response.status_code == 200
+    assert calls[0]['property_id'] == '007'
+
+
+def test_malformed_property_id_is_rejected(monkeypatch):
+    monkeypatch.setattr(db, 'get_all_applications', lambda **kwargs: [])
+
+    response = app_simplex.app.test_client().get('/api/applications?propertyId=abc')
+    assert response.status_code == 400
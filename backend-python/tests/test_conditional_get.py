@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import analytics_queries
+import app_simplex
+import db
+
+
+def use_versions(monkeypatch, updated_at, version=1):
+    monkeypatch.setattr(db, 'get_table_versions', lambda tables: {
+        table: {'version': version, 'updated_at': updated_at} for table in tables
+    })
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(analytics_queries, 'get_property_type_breakdown', lambda: [])
+    return app_simplex.app.test_client()
+
+
+def test_echoed_last_modified_is_not_modified(monkeypatch, client):
+    use_versions(monkeypatch, datetime(2026, 1, 5, 12, 30, 15, 250000, tzinfo=timezone.utc))
+
+    first = client.get('/api/analytics/property-types')
+    assert first.status_code == 200
+    assert first.last_modified == datetime(2026, 1, 5, 12, 30, 16, tzinfo=timezone.utc)
+
+    second = client.get('/api/analytics/property-types',
+                        headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert second.status_code == 304
+
+
+def test_write_after_last_modified_is_modified(monkeypatch, client):
+    use_versions(monkeypatch, datetime(2026, 1, 5, 12, 30, 15, 250000, tzinfo=timezone.utc))
+    first = client.get('/api/analytics/property-types')
+
+    use_versions(monkeypatch, datetime(2026, 1, 5, 12, 30, 16, 1000, tzinfo=timezone.utc), 2)
+    second = client.get('/api/analytics/property-types',
+                        headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert second.status_code == 200
+
+
+def test_open_second_sends_no_last_modified(monkeypatch, client):
+    # A later write in the same second would fall under a rounded-up date
+    use_versions(monkeypatch, datetime.now(timezone.utc) + timedelta(seconds=5))
+
+    response = client.get('/api/analytics/property-types')
+    assert response.status_code == 200
+    assert response.last_modified is None
+    assert response.get_etag()[0]
+
+
+def test_dashboard_etag_ignores_tenant_writes(monkeypatch, client):
+    # The dashboard reads portfolio_rollup, which only properties writes change
+    monkeypatch.setattr(analytics_queries, 'get_dashboard_metrics', lambda: {})
+    updated_at = datetime(2026, 1, 5, 12, 30, 15, tzinfo=timezone.utc)
+    monkeypatch.setattr(db, 'get_table_versions', lambda tables: {
+        table: {'version': 7 if table == 'properties' else 1, 'updated_at': updated_at}
+        for table in tables
+    })
+    first = client.get('/api/analytics/dashboard')
+
+    monkeypatch.setattr(db, 'get_table_versions', lambda tables: {
+        table: {'version': 7 if table == 'properties' else 2, 'updated_at': updated_at}
+        for table in tables
+    })
+    second = client.get('/api/analytics/dashboard',
+                        headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
@@ -0,0 +1,22 @@
+from datetime import date
+from decimal import Decimal
+
+import app_simplex
+
+
+def test_dumps_honours_json_options():
+    text = app_simplex.app.json.dumps({'b': 1, 'a': [1, 2]}, indent=2, sort_keys=True)
+    assert text == '{\n  "a": [\n    1,\n    2\n  ],\n  "b": 1\n}'
+
+
+def test_dumps_options_keep_encoding_rules():
+    text = app_simplex.app.json.dumps(
+        {'rent': Decimal('1250.50'), 'due': date(2026, 1, 1), 'ratio': float('nan')},
+        sort_keys=True
+    )
+    assert text == '{"due": "2026-01-01", "ratio": null, "rent": 1250.5}'
+
+
+def test_decimal_is_a_number():
+    # Money columns (NUMERIC) go out as JSON numbers, not strings
+    assert app_simplex.app.json.dumps({'rent': Decimal('1250.50')}) == '{"rent":1250.5}'
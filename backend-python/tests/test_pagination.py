@@ -0,0 +1,50 @@
+import re
+from pathlib import Path
+
+import psycopg2.errors
+import pytest
+
+import app_simplex
+import db
+
+SCHEMA = Path(__file__).resolve().parent.parent / 'schema.sql'
+
+
+def table_columns(table):
+    body = re.search(rf'CREATE TABLE {table} \((.*?)\n\);', SCHEMA.read_text(), re.S).group(1)
+    return {
+        line.split()[0] for line in body.splitlines()
+        if line.strip() and not line.strip().startswith(('--', 'UNIQUE', 'CHECK', 'PRIMARY', 'FOREIGN'))
+    }
+
+
+def test_transaction_fields_exist_in_schema():
+    columns = table_columns('transactions')
+    for field, expression in db.TRANSACTION_FIELDS.items():
+        # Plain columns, or lookups correlated on transactions.<column>
+        referenced = re.findall(r'transactions\.(\w+)', expression) or [expression]
+        assert set(referenced) <= columns, field
+
+
+@pytest.mark.parametrize('limit', ['abc', '0', '-5'])
+def test_malformed_limit_is_rejected(limit):
+    response = app_simplex.app.test_client().get(f'/api/properties?limit={limit}')
+    assert response.status_code == 400
+    assert 'limit' in response.get_json()['error']
+
+
+class FailingCursor:
+    def execute(self, sql, params):
+        raise psycopg2.errors.InvalidDatetimeFormat('invalid input syntax for type date')
+
+
+def test_cursor_values_of_the_wrong_type_are_rejected():
+    cursor = db.encode_cursor(['not-a-date', '2026-01-01', 1])
+    with pytest.raises(ValueError, match='Invalid pagination cursor'):
+        db.fetch_keyset_page(FailingCursor(), 'SELECT * FROM transactions',
+                             db.TRANSACTION_KEYSET, 10, cursor)
+
+
+def test_cursor_with_non_scalar_values_is_rejected():
+    with pytest.raises(ValueError, match='Invalid pagination cursor'):
+        db.decode_cursor(db.encode_cursor([{'date': '2026-01-01'}, [1], 1]))
@@ -0,0 +1,13 @@
+import time
+
+import db
+
+
+def test_forged_primary_pin_is_clamped():
+    db.set_primary_until(time.time() + 365 * 24 * 3600)
+    assert db.get_primary_until() <= time.time() + db.READ_YOUR_WRITES_WINDOW
+
+
+def test_non_finite_primary_pin_is_ignored():
+    db.set_primary_until(float('nan'))
+    assert db.get_primary_until() == 0.0
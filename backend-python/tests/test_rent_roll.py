@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+
+import pytest
+
+import app_simplex
+import db
+import rent_roll
+
+
+@pytest.mark.parametrize('path', ['/api/rent-roll', '/api/rent-roll/aging'])
+@pytest.mark.parametrize('days', [1, -1])
+def test_as_of_other_than_today_is_rejected(path, days):
+    # Ledger totals are current, so they cannot answer for another date
+    as_of = (date.today() + timedelta(days=days)).isoformat()
+
+    response = app_simplex.app.test_client().get(f'{path}?asOf={as_of}')
+    assert response.status_code == 400
+    assert 'not today' in response.get_json()['error']
+
+
+def test_accrual_reruns_when_tenants_change(monkeypatch):
+    version = {'tenants': 1}
+    runs = []
+    monkeypatch.setattr(db, 'get_table_versions', lambda tables: {
+        table: {'version': version[table], 'updated_at': None} for table in tables
+    })
+    monkeypatch.setattr(rent_roll, 'accrue_rent', runs.append)
+    monkeypatch.setattr(rent_roll, '_accrued_at', None)
+
+    rent_roll.ensure_accrued()
+    rent_roll.ensure_accrued()
+    assert len(runs) == 1
+
+    # A tenant added later the same day is accrued on the next read
+    version['tenants'] = 2
+    rent_roll.ensure_accrued()
+    assert len(runs) == 2